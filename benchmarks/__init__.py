@@ -0,0 +1 @@
+"""This package contains the micro-benchmarks of the API's hot paths."""
@@ -0,0 +1,96 @@
+"""This module load tests a running deployment of the API.
+
+Start a deployment, e.g. a single worker to measure the requests it
+serves at once:
+
+    $ gunicorn --workers 1 run:app
+
+Then run it from the project root with:
+
+    $ python -m benchmarks.bench_load --concurrency 50 'http://127.0.0.1:8000/v1/quotes?query=code'
+"""
+
+import argparse
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+
+def load(url, concurrency, total_requests, headers=None, timeout=30):
+    """Sends the requests to the URL from `concurrency` threads.
+
+    Args:
+        url (string): The URL to GET.
+        concurrency (int): The requests sent at once.
+        total_requests (int): The requests to send in total.
+        headers (dict, optional): The request headers. Defaults to None.
+        timeout (float, optional): The seconds to wait on a response.
+            Defaults to 30.
+
+    Returns:
+        tuple: The seconds it took, the latencies of the successful
+            requests in milliseconds and the total failed requests.
+    """
+
+    latencies = []
+    errors = []
+    remaining = iter(range(total_requests))
+    lock = threading.Lock()
+
+    def send_requests():
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+
+            request = urllib.request.Request(url, headers=headers or {})
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=timeout) as resp:
+                    resp.read()
+            except (urllib.error.URLError, OSError) as error:
+                with lock:
+                    errors.append(error)
+                continue
+
+            with lock:
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    threads = [threading.Thread(target=send_requests) for _ in range(concurrency)]
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return time.perf_counter() - started, latencies, len(errors)
+
+
+def main():
+    """Prints the throughput and the latency percentiles."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('url')
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--cookie', help='e.g. the access_token_cookie of a user')
+    args = parser.parse_args()
+
+    headers = {'Cookie': args.cookie} if args.cookie else {}
+    seconds, latencies, errors = load(args.url, args.concurrency, args.requests, headers)
+
+    print(f'{len(latencies)} ok, {errors} failed in {seconds:.2f} s')
+    print(f'{len(latencies) / seconds:10.1f} requests/s')
+
+    if len(latencies) > 1:
+        percentiles = statistics.quantiles(latencies, n=100)
+        for name, value in (('p50', percentiles[49]), ('p95', percentiles[94]),
+                            ('p99', percentiles[98]), ('max', max(latencies))):
+            print(f'{name:>4} {value:10.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
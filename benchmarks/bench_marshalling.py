@@ -0,0 +1,87 @@
+"""This module benchmarks the compiled marshalling against `flask_restful.marshal`.
+
+Run it from the project root with:
+
+    $ python -m benchmarks.bench_marshalling
+"""
+
+import argparse
+import json
+import timeit
+from datetime import datetime
+from types import SimpleNamespace
+
+from flask import Flask
+from flask_restful import marshal
+
+from devquotes.routes.fields import quotes_fields
+from devquotes.routes.serializers import compile_fields
+
+
+def make_page(per_page):
+    """Returns a page of quote-like objects shaped like `quotes_fields` expects."""
+
+    now = datetime.utcnow()
+    published = SimpleNamespace(name='published')
+
+    items = [
+        SimpleNamespace(
+            id=quote_id,
+            author='Linus Torvalds',
+            quotation='Talk is cheap. Show me the code.',
+            source=None,
+            total_likes=quote_id * 3,
+            is_liked=quote_id % 2 == 0,
+            status=published,
+            slug=f'talk-is-cheap-show-me-the-code-{quote_id}',
+            created_at=now,
+            updated_at=now,
+        )
+        for quote_id in range(1, per_page + 1)
+    ]
+
+    return SimpleNamespace(
+        items=items,
+        page=2,
+        next_num=3,
+        prev_num=1,
+        next_cursor=None,
+        prev_cursor=None,
+        per_page=per_page,
+        total=per_page * 10,
+        total_strategy='exact',
+    )
+
+
+def main():
+    """Prints the time per page of both marshallers."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--per-page', type=int, default=100)
+    parser.add_argument('--number', type=int, default=200)
+    args = parser.parse_args()
+
+    page = make_page(args.per_page)
+    serialize = compile_fields(quotes_fields)
+
+    with Flask(__name__).test_request_context('/v1/quotes'):
+        expected = json.dumps(marshal(page, quotes_fields))
+        assert json.dumps(serialize(page)) == expected, 'The outputs differ.'
+
+        results = {
+            'flask_restful.marshal': timeit.timeit(
+                lambda: marshal(page, quotes_fields), number=args.number
+            ),
+            'compile_fields': timeit.timeit(
+                lambda: serialize(page), number=args.number
+            ),
+        }
+
+    baseline = results['flask_restful.marshal']
+    for name, total_seconds in results.items():
+        per_page_ms = total_seconds / args.number * 1000
+        print(f'{name:<24} {per_page_ms:8.3f} ms/page  {baseline / total_seconds:5.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""This module benchmarks the suggestions of authors and quotes as the user types.
+
+Run it from the project root with:
+
+    $ python -m benchmarks.bench_suggestions
+"""
+
+import argparse
+import random
+import time
+import timeit
+
+from flask import Flask
+
+from devquotes.routes.suggestions import QuoteSuggestions
+
+WORDS = (
+    'code data program bug test deploy cache query index merge branch '
+    'commit review design simple complex fast slow error type function '
+    'class object module package server client network memory thread'
+).split()
+
+
+def make_suggestions(total_quotes, seed=0):
+    """Returns a `QuoteSuggestions` indexing random quote-like texts."""
+
+    rng = random.Random(seed)
+    suggestions = QuoteSuggestions()
+
+    rows = []
+    for quote_id in range(1, total_quotes + 1):
+        author = f'{rng.choice(WORDS).title()} {rng.choice(WORDS).title()}son'
+        quotation = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(6, 20)))
+        rows.append((quote_id, author, quotation))
+
+    started = time.perf_counter()
+    suggestions.replace(rows)
+    print(f'{"(rebuild)":<24} {(time.perf_counter() - started) * 1000:8.1f} ms')
+
+    # indexed in memory only, never rebuilt from the database
+    suggestions._loaded_at = float('inf')  # pylint: disable=protected-access
+
+    return suggestions
+
+
+def main():
+    """Prints the time per suggestion of a few typed queries."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quotes', type=int, default=20000)
+    parser.add_argument('--number', type=int, default=1000)
+    args = parser.parse_args()
+
+    suggestions = make_suggestions(args.quotes)
+    queries = ['c', 'cache', 'cache qu', 'simple fast error ty', 'commitson']
+
+    with Flask(__name__).app_context():
+        for query in queries:
+            total_seconds = timeit.timeit(
+                lambda query=query: suggestions.suggest(query), number=args.number
+            )
+            per_query_ms = total_seconds / args.number * 1000
+            print(f'{query!r:<24} {per_query_ms:8.3f} ms/query')
+
+
+if __name__ == '__main__':
+    main()
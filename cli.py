@@ -56,6 +56,45 @@ def register(app):
 
         print(f'Deleted {row_count} spam quote/s.')
 
+    @app.cli.command()
+    def flushlikes():
+        """Folds the pending like deltas into quote's `total_likes`."""
+
+        # pylint: disable=import-outside-toplevel
+        from devquotes.routes import db_client
+
+        row_count = db_client.flush_like_counters()
+        print(f'Updated the total likes of {row_count} quote/s.')
+
+    @app.cli.command('recompute-stats')
+    def recompute_stats():
+        """Rebuilds the users' stats from the like and quote tables."""
+
+        # pylint: disable=import-outside-toplevel
+        from devquotes.routes import stats
+
+        row_count = stats.recompute_user_stats()
+        print(f'Recomputed the stats of {row_count} user/s.')
+
+    @app.cli.command('check-stats')
+    def check_stats():
+        """Reports the users whose stored stats have drifted."""
+
+        # pylint: disable=import-outside-toplevel
+        from devquotes.routes import stats
+
+        rows = stats.get_user_stats_drift()
+        for row in rows:
+            print(
+                f'User {row.user_id}: '
+                f'total_likes {row.stored_total_likes} != {row.actual_total_likes}, '
+                f'total_submitted {row.stored_total_submitted} != {row.actual_total_submitted}'
+            )
+
+        print(f'Found {len(rows)} user/s with drifted stats.')
+        if rows:
+            raise SystemExit(1)
+
 
 def get_filenames(path):
     """Returns the JSON filenames on the given `path` sorted
@@ -16,18 +16,102 @@ class Config:
     JWT_COOKIE_CSRF_PROTECT = True
     JWT_ERROR_MESSAGE_KEY = 'message'
 
+    SESSION_COOKIE_SECURE = True
+
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         os.environ['SQLALCHEMY_DATABASE_URI']
 
+    # each worker has its own pool of at most `pool_size + max_overflow`
+    # connections, the workers' total must fit Postgres' `max_connections`,
+    # see `/v1/_internal/pool`
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('SQLALCHEMY_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('SQLALCHEMY_MAX_OVERFLOW', 10)),
+        'pool_timeout': float(os.environ.get('SQLALCHEMY_POOL_TIMEOUT', 30)),  # seconds
+        'pool_recycle': int(os.environ.get('SQLALCHEMY_POOL_RECYCLE', 1800)),  # seconds
+        'pool_pre_ping': os.environ.get('SQLALCHEMY_POOL_PRE_PING', '1') == '1',
+    }
+
+    # when set, the read-only queries go to this read replica, except
+    # for the clients that wrote in the last `REPLICA_STICKINESS` seconds
+    # so they read their own writes while the replica catches up
+    SQLALCHEMY_BINDS = {
+        'replica': os.environ['SQLALCHEMY_REPLICA_URI'],
+    } if os.environ.get('SQLALCHEMY_REPLICA_URI') else {}
+    REPLICA_STICKINESS = int(os.environ.get('REPLICA_STICKINESS', 10))  # seconds
+
     ADMINS = os.environ['ADMINS'].split(',')
     FIREBASE_CREDENTIAL = os.environ['FIREBASE_CREDENTIAL']
 
+    # the claims of verified Firebase ID tokens are cached for this long,
+    # but never past the token's expiry
+    ID_TOKEN_CACHE_TTL = int(os.environ.get('ID_TOKEN_CACHE_TTL', 300))  # seconds
+
+    # when set, Google's public keys are shared by the workers through this file
+    FIREBASE_PUBLIC_KEYS_CACHE = os.environ.get('FIREBASE_PUBLIC_KEYS_CACHE')
+
+    # the authors and quotations are suggested from an in-memory index,
+    # this is how often it's rebuilt to catch up with the changes made
+    # by other workers
+    SUGGESTIONS_MAX_AGE = int(os.environ.get('SUGGESTIONS_MAX_AGE', 300))  # seconds
+
+    # a search only paginates its best matches, they're ranked once and
+    # the ranking is reused by the follow-up pages for this long
+    SEARCH_MAX_RESULTS = int(os.environ.get('SEARCH_MAX_RESULTS', 1000))
+    SEARCH_RESULTS_CACHE_TTL = int(os.environ.get('SEARCH_RESULTS_CACHE_TTL', 60))  # seconds
+
+    # the quotes similar to a search query follow its full-text matches
+    # when they're fewer than this, it requires the `pg_trgm` extension
+    SEARCH_FUZZY_MIN_HITS = int(os.environ.get('SEARCH_FUZZY_MIN_HITS', 3))
+
+    # the ranking queries of a search are canceled after this long, the
+    # fuzzy matches are then skipped
+    SEARCH_STATEMENT_TIMEOUT = int(os.environ.get('SEARCH_STATEMENT_TIMEOUT', 500))  # ms
+
+    # the quote pages shared by every user are cached by `local` (an in-process
+    # LRU bounded by `RESPONSE_CACHE_MAX_SIZE`), by `socket` (a memcached
+    # reached through `RESPONSE_CACHE_SOCKET`, a Unix socket path or
+    # `host:port`) or not at all with `none`
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'local')
+    RESPONSE_CACHE_MAX_SIZE = int(
+        os.environ.get('RESPONSE_CACHE_MAX_SIZE', 32 * 1024 * 1024)
+    )  # bytes
+    RESPONSE_CACHE_SOCKET = os.environ.get('RESPONSE_CACHE_SOCKET')
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 60))  # seconds
+
+    # how long shared caches, e.g. a CDN, may serve the anonymous quote
+    # responses without revalidating them, 0 to always revalidate
+    RESPONSE_CACHE_MAX_AGE = int(os.environ.get('RESPONSE_CACHE_MAX_AGE', 0))  # seconds
+
     ALLOWED_ORIGINS = os.environ['ALLOWED_ORIGINS'].split(',')
 
     # this value should match the name on `quote_status` seeder
     PUBLISHED_STATUS_NAME = 'published'
 
+    # the quote statuses are cached in memory, this is how often they're
+    # reloaded to catch up with the changes made by other workers
+    QUOTE_STATUSES_MAX_AGE = int(os.environ.get('QUOTE_STATUSES_MAX_AGE', 300))  # seconds
+
+    # how the `total` of paginated quotes is computed, one of
+    # `exact`, `cached`, `estimated` or `omitted`
+    QUOTES_TOTAL_STRATEGY = os.environ.get('QUOTES_TOTAL_STRATEGY', 'exact')
+    QUOTES_TOTAL_CACHE_TTL = int(os.environ.get('QUOTES_TOTAL_CACHE_TTL', 60))  # seconds
+
+    # the ids of published quotes are kept in memory for picking random
+    # quotes, this is how often they're reloaded to catch up with the
+    # changes made by other workers
+    RANDOM_QUOTE_IDS_MAX_AGE = int(os.environ.get('RANDOM_QUOTE_IDS_MAX_AGE', 300))  # seconds
+
+    # how often the pending like deltas are folded into quote's
+    # `total_likes`, set to 0 to only flush with `flask flushlikes`
+    LIKE_COUNTER_FLUSH_INTERVAL = float(os.environ.get('LIKE_COUNTER_FLUSH_INTERVAL', 5))  # seconds
+
+    # the memory limit for the per user shuffled decks of quote ids
+    RANDOM_QUOTE_DECKS_MAX_SIZE = int(
+        os.environ.get('RANDOM_QUOTE_DECKS_MAX_SIZE', 16 * 1024 * 1024)
+    )  # bytes
+
 
 class Development(Config):
     """Development configurations."""
@@ -40,6 +124,7 @@ class Development(Config):
     JWT_ACCESS_TOKEN_EXPIRES = 10  # seconds
     JWT_COOKIE_SECURE = False
     JWT_COOKIE_CSRF_PROTECT = False
+    SESSION_COOKIE_SECURE = False
 
 
 class Production(Config):
@@ -62,3 +147,13 @@ class Testing(Config):
     BCRYPT_LOG_ROUNDS = 4
     JWT_COOKIE_SECURE = False
     JWT_COOKIE_CSRF_PROTECT = False
+    SESSION_COOKIE_SECURE = False
+    LIKE_COUNTER_FLUSH_INTERVAL = 0
+
+    # the fuzzy search requires `pg_trgm`, it's enabled by its own tests
+    SEARCH_FUZZY_MIN_HITS = 0
+
+    # when set, ID tokens are verified with this local JSON key set instead
+    # of Google's public keys, it's ignored unless `TESTING` is on since it
+    # would let anyone holding its private key forge ID tokens
+    FIREBASE_PUBLIC_KEYS_FILE = None
@@ -1,16 +1,24 @@
 """This module contains the application models."""
 
 from flask_migrate import Migrate
-from flask_sqlalchemy import SQLAlchemy, BaseQuery
+from flask_sqlalchemy import BaseQuery
 
 from sqlalchemy_searchable import SearchQueryMixin, make_searchable
 
+from .pool import InstrumentedQueuePool
+from .routing import RoutingSQLAlchemy
+
 
 class SearchQuery(BaseQuery, SearchQueryMixin):
     """Special class for enabling search on a table."""
 
 
-db = SQLAlchemy(query_class=SearchQuery)
+# the pool is sized by `SQLALCHEMY_ENGINE_OPTIONS`, its class is always
+# the instrumented one for the `/_internal/pool` metrics
+db = RoutingSQLAlchemy(
+    query_class=SearchQuery,
+    engine_options={'poolclass': InstrumentedQueuePool},
+)
 make_searchable(db.metadata)
 
 migrate = Migrate(compare_type=True)
@@ -14,6 +14,10 @@ class Like(BaseMixin, db.Model):
     __tablename__ = 'like'
     __table_args__ = (
         db.PrimaryKeyConstraint('user_id', 'quote_id'),
+        # the user's favorites are listed most recently liked first
+        db.Index('ix_like_user_id_created_at', 'user_id', 'created_at'),
+        # the likes of a deleted quote are removed by a cascade
+        db.Index('ix_like_quote_id', 'quote_id'),
     )
 
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
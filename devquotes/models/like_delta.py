@@ -0,0 +1,19 @@
+"""This module defines the structure of quote_like_delta table."""
+
+from . import db
+from .mixins import BaseMixin
+
+
+class LikeDelta(BaseMixin, db.Model):
+    """A model to store the pending changes of quote's `total_likes`.
+
+    Rows are only appended by the like write paths and are folded into
+    `Quote.total_likes` by `db_client.flush_like_counters`, so liking a
+    quote never locks the quote row.
+    """
+
+    __tablename__ = 'quote_like_delta'
+
+    id = db.Column(db.BigInteger, primary_key=True, nullable=False)
+    quote_id = db.Column(db.Integer, nullable=False)
+    delta = db.Column(db.SmallInteger, nullable=False)
@@ -0,0 +1,182 @@
+"""This module contains the instrumented connection pool of the database
+engine and the metrics it collects for sizing the pool."""
+
+import time
+from bisect import bisect_left
+from threading import Lock
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+# the upper bounds of the checkout latency histogram's buckets
+LATENCY_BUCKETS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)  # ms
+
+
+class PoolMetrics:
+    """The counters of the pool's checkouts, collected per process since
+    each worker has its own pool."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        """Zeroes all the counters."""
+
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.overflow_checkouts = 0
+            self.peak_overflow = 0
+            self.connects = 0
+            self.invalidations = 0
+            self.soft_invalidations = 0
+            self.latency_sum = 0.0
+            self.latency_max = 0.0
+            self._latency_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def record_checkout(self, latency, overflow):
+        """Records a checkout.
+
+        Args:
+            latency (float): The milliseconds it took to get the connection.
+            overflow (int): The pool's overflow connections after the checkout.
+        """
+
+        with self._lock:
+            self.checkouts += 1
+            self.latency_sum += latency
+            self.latency_max = max(self.latency_max, latency)
+            self._latency_counts[bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+            if overflow > 0:
+                self.overflow_checkouts += 1
+                self.peak_overflow = max(self.peak_overflow, overflow)
+
+    def record_timeout(self):
+        """Records a checkout that timed out waiting for a connection."""
+
+        with self._lock:
+            self.timeouts += 1
+
+    def record_connect(self):
+        """Records a new database connection."""
+
+        with self._lock:
+            self.connects += 1
+
+    def record_invalidation(self, soft=False):
+        """Records an invalidated connection, a soft invalidation lets
+        the connection finish its checkout before it's replaced."""
+
+        with self._lock:
+            if soft:
+                self.soft_invalidations += 1
+            else:
+                self.invalidations += 1
+
+    def to_dict(self):
+        """Returns the counters, the latency histogram's buckets are
+        cumulative like Prometheus' and the last one has no bound."""
+
+        with self._lock:
+            buckets = []
+            total = 0
+            for bound, count in zip(LATENCY_BUCKETS + (None,), self._latency_counts):
+                total += count
+                buckets.append({'le': bound, 'count': total})
+
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'overflow_checkouts': self.overflow_checkouts,
+                'peak_overflow': self.peak_overflow,
+                'connects': self.connects,
+                'invalidations': self.invalidations,
+                'soft_invalidations': self.soft_invalidations,
+                'latency': {
+                    'sum': self.latency_sum,
+                    'max': self.latency_max,
+                    'buckets': buckets,
+                },
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """A `QueuePool` that records its checkouts into its own `metrics`, so
+    the primary's and the replica's engines are told apart, the latency
+    includes waiting for a free connection, opening a new one and the
+    `pool_pre_ping`."""
+
+    def __init__(self, creator, **kwargs):
+        super().__init__(creator, **kwargs)
+        self.metrics = PoolMetrics()
+
+        # a recreated pool inherits the listeners of the pool it replaces
+        if not kwargs.get('_dispatch'):
+            _listen_connections(self, self.metrics)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+
+        return pool
+
+    def connect(self):
+        return self._timed_checkout(super().connect)
+
+    def unique_connection(self):
+        return self._timed_checkout(super().unique_connection)
+
+    def _timed_checkout(self, checkout):
+        """Checks out a connection with the given method of the base class
+        and records how long it took."""
+
+        started = time.perf_counter()
+
+        try:
+            conn = checkout()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+
+        latency = (time.perf_counter() - started) * 1000
+        self.metrics.record_checkout(latency, self.overflow())
+
+        return conn
+
+
+def _listen_connections(pool, metrics):
+    """Registers the event listeners that count the pool's new and
+    invalidated connections into the given metrics.
+
+    Args:
+        pool (object): The `InstrumentedQueuePool`.
+        metrics (object): The pool's `PoolMetrics`.
+    """
+
+    event.listen(pool, 'connect', lambda *_: metrics.record_connect())
+    event.listen(pool, 'invalidate', lambda *_: metrics.record_invalidation())
+    event.listen(
+        pool, 'soft_invalidate', lambda *_: metrics.record_invalidation(soft=True))
+
+
+def get_pool_status(pool):
+    """Returns the current state of the given pool.
+
+    Args:
+        pool (object): The engine's `QueuePool`.
+
+    Returns:
+        dict: The pool's `size`, `max_overflow`, `timeout`, and its
+            `checked_in`, `checked_out` and `overflow` connections.
+    """
+
+    return {
+        'size': pool.size(),
+        'max_overflow': pool._max_overflow,  # pylint: disable=protected-access
+        'timeout': pool.timeout(),
+        'checked_in': pool.checkedin(),
+        'checked_out': pool.checkedout(),
+        'overflow': max(pool.overflow(), 0),
+    }
@@ -11,11 +11,21 @@ from .mixins import BaseMixin
 
 utcnow = datetime.utcnow
 
+# bumped after every committed write that changes the quotes' responses,
+# the ETags of the quote endpoints are computed from its value
+quotes_version = db.Sequence('quotes_version_seq', metadata=db.Model.metadata)
+
 
 class Quote(db.Model, BaseMixin):
     """A model to store quote related data."""
 
     __tablename__ = 'quote'
+    __table_args__ = (
+        # the list queries filter by status and page through the most
+        # recent quotes first, backward scans serve the descending order
+        db.Index('ix_quote_status_id_created_at', 'status_id', 'created_at', 'id'),
+        db.Index('ix_quote_contributor_id', 'contributor_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, nullable=False)
     author = db.Column(db.String(100), nullable=False)
@@ -24,14 +34,16 @@ class Quote(db.Model, BaseMixin):
     total_likes = db.Column(db.Integer, nullable=False, default=0)
     slug = db.Column(db.String(200), nullable=True)
 
-    contributor_id = db.Column(
+    # the old values are loaded on change, even if expired, for moving
+    # the `total_submitted` between the contributors
+    contributor_id = db.column_property(db.Column(
         db.Integer, db.ForeignKey('user.id'), nullable=False
-    )
+    ), active_history=True)
     contributor = db.relationship('User', back_populates='contributed_quotes')
 
-    status_id = db.Column(
+    status_id = db.column_property(db.Column(
         db.Integer, db.ForeignKey('quote_status.id'), nullable=False
-    )
+    ), active_history=True)
     status = db.relationship('QuoteStatus', back_populates='quotes')
 
     created_at = db.Column(db.DateTime, nullable=False, default=utcnow)
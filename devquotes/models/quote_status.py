@@ -1,5 +1,11 @@
 """This module defines the structure of quote_status table."""
 
+import time
+from threading import RLock
+
+from flask import current_app
+from sqlalchemy import event
+
 from . import db
 from .mixins import BaseMixin
 
@@ -14,3 +20,100 @@ class QuoteStatus(db.Model, BaseMixin):
     display_name = db.Column(db.String(50), nullable=False)
 
     quotes = db.relationship('Quote', back_populates='status')
+
+
+class StatusRecord:
+    """A plain copy of `QuoteStatus` that can be shared across sessions."""
+
+    # pylint: disable=too-few-public-methods,redefined-builtin
+
+    __slots__ = ('id', 'name', 'display_name')
+
+    def __init__(self, id, name, display_name):
+        self.id = id
+        self.name = name
+        self.display_name = display_name
+
+
+class QuoteStatusRegistry:
+    """A process-wide cache of the quote statuses, so the quote queries
+    can filter by status id instead of joining `quote_status`.
+
+    The statuses are loaded once and reloaded when a status is written
+    by this process, or once they get older than `QUOTE_STATUSES_MAX_AGE`
+    seconds to pick up the changes made by other processes.
+    """
+
+    def __init__(self, timer=time.monotonic):
+        self.timer = timer
+
+        self._statuses = []
+        self._ids = {}
+        self._records = {}
+        self._loaded_at = None
+        self._lock = RLock()
+
+    def all(self):
+        """Returns all the quote statuses as `StatusRecord`."""
+
+        with self._lock:
+            self._load_if_stale()
+            return list(self._statuses)
+
+    def get_id(self, name):
+        """Returns the id of the status with the given `name`,
+        or `None` if it doesn't exist."""
+
+        with self._lock:
+            self._load_if_stale()
+            return self._ids.get(name)
+
+    def get(self, status_id):
+        """Returns the `StatusRecord` of the given id, the statuses are
+        reloaded once if it's missing, or `None` if it doesn't exist."""
+
+        with self._lock:
+            self._load_if_stale()
+
+            status = self._records.get(status_id)
+            if status is None:
+                # the status may be created by another process
+                self._loaded_at = None
+                self._load_if_stale()
+                status = self._records.get(status_id)
+
+            return status
+
+    def invalidate(self):
+        """Marks the statuses to be reloaded on their next use."""
+
+        with self._lock:
+            self._loaded_at = None
+
+    def _load_if_stale(self):
+        """Loads the statuses from the database if they're stale."""
+
+        max_age = current_app.config.get('QUOTE_STATUSES_MAX_AGE', 300)
+        if self._loaded_at is not None and self.timer() - self._loaded_at <= max_age:
+            return
+
+        self._statuses = [
+            StatusRecord(status.id, status.name, status.display_name)
+            for status in QuoteStatus.query.order_by(QuoteStatus.id).all()
+        ]
+        self._ids = {status.name: status.id for status in self._statuses}
+        self._records = {status.id: status for status in self._statuses}
+        self._loaded_at = self.timer()
+
+
+quote_statuses = QuoteStatusRegistry()
+
+
+@event.listens_for(QuoteStatus, 'after_insert')
+@event.listens_for(QuoteStatus, 'after_update')
+@event.listens_for(QuoteStatus, 'after_delete')
+def invalidate_quote_statuses(*_):
+    """An event listener that invalidates the quote status registry
+    when quote status is written."""
+
+    quote_statuses.invalidate()
@@ -0,0 +1,83 @@
+"""This module contains the session that routes the reads to the read
+replica, configured as the `replica` bind of `SQLALCHEMY_BINDS`."""
+
+from contextlib import contextmanager
+
+from flask_sqlalchemy import SQLAlchemy, SignallingSession
+from sqlalchemy import event, orm
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA_BIND = 'replica'
+
+
+class RoutingSession(SignallingSession):
+    """A session whose statements go to the read replica while it's
+    `reading_replica`, unless the transaction already wrote to the
+    primary, the writes always go to the primary."""
+
+    def __init__(self, db, **options):
+        super().__init__(db, **options)
+
+        self.db = db
+        self.has_writes = False
+        self._reads_replica = False
+
+    @contextmanager
+    def reading_replica(self):
+        """Routes the reads of the block to the replica, if configured."""
+
+        reads_replica = self._reads_replica
+        self._reads_replica = True
+        try:
+            yield
+        finally:
+            self._reads_replica = reads_replica
+
+    def get_bind(self, mapper=None, clause=None):
+        """Returns the engine of the replica while `reading_replica`,
+        unless the statement is a write, the session is flushing, or the
+        transaction already wrote or flushed, those stay on the primary
+        until the transaction ends. Otherwise the bind is chosen like
+        `SignallingSession` does."""
+
+        if isinstance(clause, UpdateBase):
+            self.has_writes = True
+        elif self._reads_replica and not self.has_writes and not self._flushing:
+            engine = self._get_replica_engine()
+            if engine is not None:
+                return engine
+
+        return super().get_bind(mapper, clause)
+
+    def _get_replica_engine(self):
+        """Returns the engine of the replica, or `None` if not configured."""
+
+        if REPLICA_BIND not in self.app.config['SQLALCHEMY_BINDS']:
+            return None
+
+        return self.db.get_engine(self.app, bind=REPLICA_BIND)
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+    """The `SQLAlchemy` extension with the `RoutingSession`."""
+
+    def create_session(self, options):
+        """Returns the factory of the `RoutingSession`s."""
+
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def mark_has_writes(session, _):
+    """An event listener that keeps the rest of the transaction on the
+    primary once it flushed, the replica wouldn't see its writes."""
+
+    session.has_writes = True
+
+
+@event.listens_for(RoutingSession, 'after_transaction_end')
+def reset_has_writes(session, transaction):
+    """An event listener that lets the next transaction read the replica."""
+
+    if transaction.parent is None:
+        session.has_writes = False
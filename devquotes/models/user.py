@@ -1,14 +1,12 @@
 """This module defines the structure of user table."""
 
-from flask import current_app
-from sqlalchemy.sql.expression import func
-
 from . import db
-from .like import Like
-from .quote import Quote
-from .quote_status import QuoteStatus
 from .mixins import BaseMixin
 
+# imported so the relationships below can be resolved by name
+from .quote import Quote  # pylint: disable=unused-import
+from .user_stats import UserStats  # pylint: disable=unused-import
+
 
 class User(BaseMixin, db.Model):
     """A model to store user related data."""
@@ -23,27 +21,16 @@ class User(BaseMixin, db.Model):
 
     contributed_quotes = db.relationship('Quote', back_populates='contributor')
 
+    stats = db.relationship('UserStats', uselist=False, lazy='joined', viewonly=True)
+
     @property
     def total_likes(self):
         """Returns the total liked quotes of the user."""
 
-        return (
-            db.session
-            .query(func.count(Like.user_id))
-            .filter_by(user_id=self.id)
-            .scalar()
-        )
+        return self.stats.total_likes if self.stats else 0
 
     @property
     def total_submitted(self):
         """Returns the total published quotes submitted by the user."""
 
-        status_name = current_app.config['PUBLISHED_STATUS_NAME']
-        return (
-            db.session
-            .query(func.count(Quote.id))
-            .join(QuoteStatus)
-            .filter(QuoteStatus.name == status_name)
-            .filter(Quote.contributor_id == self.id)
-            .scalar()
-        )
+        return self.stats.total_submitted if self.stats else 0
@@ -0,0 +1,24 @@
+"""This module defines the structure of user_stats table."""
+
+from . import db
+from .mixins import BaseMixin
+
+
+class UserStats(BaseMixin, db.Model):
+    """A model to store the denormalised stats of a user.
+
+    The counters are kept up to date by the like and quote write paths
+    in `db_client` and can be rebuilt with `flask recompute-stats`.
+    """
+
+    __tablename__ = 'user_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey(
+        'user.id', ondelete='CASCADE'), primary_key=True, nullable=False)
+    total_likes = db.Column(db.Integer, nullable=False, default=0)
+    total_submitted = db.Column(db.Integer, nullable=False, default=0)
+
+    # bumped whenever the stats are written, tells that the user's
+    # liked quotes may have changed, a user without stats is at 0 and
+    # the stats start at 1, whether created or migrated
+    likes_version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
@@ -17,6 +17,10 @@ def init_app(app):
     from flask_cors import CORS
     from flask_jwt_extended import JWTManager
 
+    from .pagination import check_total_strategy
+
+    check_total_strategy(app.config)
+
     allowed_origins = app.config['ALLOWED_ORIGINS']
     CORS(app, supports_credentials=True, origins=allowed_origins)
 
@@ -37,11 +41,14 @@ def init_app(app):
 
     firebase_admin.initialize_app(credential=credential)
 
-    from .auth import Token, TokenRevoke, TokenRefresh
-    from .quote import Quotes, Quote, Random as RandomQuote, Contributor
-    from .like import Likes, Like
+    from .auth import Token, TokenRevoke, TokenRefresh, forget_jwt
+    from .quote import Quotes, Quote, Random as RandomQuote, Suggestions, Contributor
+    from .like import Likes, Like, LikesBatch
     from .user import User, CurrentUser
     from .quote_status import QuoteStatus
+    from .pool import Pool
+
+    app.before_request(forget_jwt)
 
     api.init_app(bp)
     api.add_resource(Token, '/auth/token')
@@ -50,11 +57,14 @@ def init_app(app):
     api.add_resource(Quotes, '/quotes')
     api.add_resource(Quote, '/quotes/<int:quote_id>')
     api.add_resource(RandomQuote, '/quotes/random')
+    api.add_resource(Suggestions, '/quotes/suggest')
     api.add_resource(Likes, '/likes')
+    api.add_resource(LikesBatch, '/likes/batch')
     api.add_resource(Like, '/likes/<int:quote_id>')
     api.add_resource(User, '/users/<int:user_id>')
     api.add_resource(CurrentUser, '/users/me')
     api.add_resource(Contributor, '/quotes/<int:quote_id>/contributor')
     api.add_resource(QuoteStatus, '/quote-statuses')
+    api.add_resource(Pool, '/_internal/pool')
 
     app.register_blueprint(bp, url_prefix='/v1')
@@ -1,12 +1,12 @@
 """This module contains authorization API."""
 
-from firebase_admin import auth
 from firebase_admin.auth import (
     InvalidIdTokenError,
     ExpiredIdTokenError,
     RevokedIdTokenError,
 )
 from flask import (
+    _app_ctx_stack,
     current_app,
     jsonify,
     make_response
@@ -23,13 +23,14 @@ from flask_jwt_extended import (
 )
 from flask_restful import (
     abort,
-    marshal,
     Resource,
     reqparse,
 )
 
 from . import db_client
 from .fields import user_fields
+from .serializers import marshal
+from .tokens import id_token_verifier
 
 
 class Token(Resource):
@@ -44,18 +45,16 @@ class Token(Resource):
         args = parser.parse_args()
 
         try:
-            firebase_user = auth.verify_id_token(args['token'])
+            firebase_user = id_token_verifier.verify(args['token'])
         except (ValueError, InvalidIdTokenError, ExpiredIdTokenError, RevokedIdTokenError) as error:
             abort(401, message=str(error))
 
-        user = db_client.get_user(firebase_user_id=firebase_user['user_id'])
-        if not user:
-            user = db_client.create_user({
-                'firebase_user_id': firebase_user['user_id'],
-                'is_admin': firebase_user['email'] in current_app.config['ADMINS'],
-                'name': firebase_user['name'],
-                'picture_url': firebase_user['picture'],
-            })
+        user = db_client.upsert_user({
+            'firebase_user_id': firebase_user['user_id'],
+            'is_admin': firebase_user.get('email') in current_app.config['ADMINS'],
+            'name': _get_display_name(firebase_user),
+            'picture_url': firebase_user.get('picture'),
+        })
 
         identity = {
             'firebase_user_id': user.firebase_user_id,
@@ -99,3 +98,36 @@ class TokenRevoke(Resource):
         response = jsonify({})
         unset_jwt_cookies(response)
         return make_response(response, 204)
+
+
+def _get_display_name(firebase_user):
+    """A helper that returns the user's name, the accounts signed in with
+    an email or a phone number may have none.
+
+    Args:
+        firebase_user (dict): The claims of the user's ID token.
+
+    Returns:
+        string: The name, or else the email's local part, or else
+            the phone number.
+    """
+
+    name = firebase_user.get('name')
+    if name:
+        return name
+
+    email = firebase_user.get('email')
+    if email:
+        return email.split('@')[0]
+
+    return firebase_user.get('phone_number') or 'Anonymous'
+
+
+def forget_jwt():
+    """Drops the JWT of the previous request, the app context is pushed
+    once for the app's lifetime and `jwt_optional` doesn't reset it on
+    a request without a token, which would look authenticated."""
+
+    ctx = vars(_app_ctx_stack.top)
+    for name in ('jwt', 'jwt_header', 'jwt_user', 'expired_jwt'):
+        ctx.pop(name, None)
@@ -0,0 +1,109 @@
+"""This module contains the in-process caches used by the API."""
+
+import time
+from collections import OrderedDict
+from threading import RLock
+
+_MISSING = object()
+
+
+class LRUCache:
+    """A thread-safe cache bounded by the total size of its entries, the least
+    recently used entry is evicted first and entries can optionally expire.
+
+    Args:
+        maxsize (int, optional): The maximum total size of the entries.
+            Defaults to 1024.
+        ttl (float, optional): The default seconds before an entry expires,
+            entries never expire if `None`. Defaults to None.
+        timer (callable, optional): The clock used for expiring entries.
+            Defaults to `time.monotonic`.
+        getsizeof (callable, optional): Returns the size of a value, every
+            entry has a size of 1 if not set. Defaults to None.
+    """
+
+    # pylint: disable=too-many-arguments
+
+    def __init__(self, maxsize=1024, ttl=None, timer=time.monotonic, getsizeof=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.getsizeof = getsizeof
+        self.currsize = 0
+
+        self._entries = OrderedDict()
+        self._lock = RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key, default=None):
+        """Returns the value for the given `key`, or `default` if the
+        key is not cached or has expired."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+
+            value, expires_at, _ = entry
+            if expires_at is not None and expires_at <= self.timer():
+                self._remove(key)
+                return default
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Caches the `value` for the given `key`, values larger than
+        the cache's `maxsize` are not cached.
+
+        Args:
+            key (object): The hashable key.
+            value (object): The value to cache.
+            ttl (float, optional): The seconds before the entry expires,
+                overrides the cache's default. Defaults to None.
+        """
+
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = None if ttl is None else self.timer() + ttl
+        size = self.getsizeof(value) if self.getsizeof else 1
+
+        with self._lock:
+            self._remove(key)
+            if size > self.maxsize:
+                return
+
+            self._entries[key] = (value, expires_at, size)
+            self.currsize += size
+
+            while self.currsize > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def pop(self, key, default=None):
+        """Removes the given `key` and returns its value."""
+
+        with self._lock:
+            entry = self._remove(key)
+
+        return default if entry is None else entry[0]
+
+    def clear(self):
+        """Removes all the entries."""
+
+        with self._lock:
+            self._entries.clear()
+            self.currsize = 0
+
+    def _remove(self, key):
+        """Removes the given `key` and returns its entry, the caller
+        must hold the lock."""
+
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.currsize -= entry[2]
+
+        return entry
@@ -0,0 +1,58 @@
+"""This module contains the helpers for the conditional GET of quotes."""
+
+import hashlib
+import json
+
+from flask import make_response, request
+from werkzeug.http import quote_etag
+
+from . import db_client
+
+
+def get_quotes_etag(user_id, *parts, versions=None):
+    """Returns the strong ETag of a quote response for the current user,
+    it's computed without running the response's query.
+
+    The quotes version is bumped by every committed write that changes a
+    quote (including its `updated_at` and `total_likes`) and the user's
+    likes version by every like or unlike of the user, so the ETag only
+    changes when the response may change.
+
+    Args:
+        user_id (int): The current user's id, or `None` if anonymous.
+        parts (list): The values identifying the response, e.g. the
+            quote id or the request's URL.
+        versions (tuple, optional): The versions already returned by
+            `get_quotes_version` for the user. Defaults to None.
+
+    Returns:
+        string: The unquoted ETag.
+    """
+
+    if versions is None:
+        versions = db_client.get_quotes_version(user_id)
+
+    payload = json.dumps([versions, user_id, parts], default=str)
+
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def is_not_modified(etag):
+    """Returns `True` if the client's `If-None-Match` matches the ETag."""
+
+    return request.if_none_match.contains(etag)
+
+
+def not_modified(etag):
+    """Returns an empty 304 response with the given ETag."""
+
+    response = make_response('', 304)
+    response.set_etag(etag)
+
+    return response
+
+
+def etag_headers(etag):
+    """Returns the headers that set the given ETag on a response."""
+
+    return {'ETag': quote_etag(etag)}
@@ -0,0 +1,43 @@
+"""This module contains the background flusher of the like counters."""
+
+import threading
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from devquotes.models import db
+
+
+class LikeCounterFlusher(threading.Thread):
+    """A daemon thread that periodically folds the pending like deltas
+    into quote's `total_likes`.
+
+    Args:
+        app (object): The Flask app instance.
+        interval (float): The seconds between each flush, this is how long
+            quote's `total_likes` may lag behind its likes.
+    """
+
+    def __init__(self, app, interval):
+        super().__init__(name='like-counter-flusher', daemon=True)
+        self.app = app
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self):
+        # pylint: disable=import-outside-toplevel
+        from . import db_client
+
+        while not self._stopped.wait(self.interval):
+            with self.app.app_context():
+                try:
+                    db_client.flush_like_counters()
+                except SQLAlchemyError:
+                    self.app.logger.exception('Failed to flush like counters')
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+
+    def stop(self):
+        """Stops the thread after its current flush."""
+
+        self._stopped.set()
@@ -1,20 +1,59 @@
 """This module contains all database operations used on the API endpoints."""
 
 import operator as op
+import os
+from collections import Counter
+from datetime import datetime
+from functools import partial
 
 from flask import current_app
-from sqlalchemy import and_, case, event
-from sqlalchemy.sql.expression import func
+from sqlalchemy import and_, any_, case, event, literal, select
+from sqlalchemy.orm import object_session
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.sql.expression import column, func, table
 
+from devquotes.models import db
 from devquotes.models.like import Like
+from devquotes.models.like_delta import LikeDelta
+from devquotes.models.pool import get_pool_status
+from devquotes.models.routing import REPLICA_BIND
 from devquotes.models.user import User
-from devquotes.models.quote import Quote
-from devquotes.models.quote_status import QuoteStatus
+from devquotes.models.user_stats import UserStats
+from devquotes.models.quote import Quote, quotes_version
+from devquotes.models.quote_status import QuoteStatus, quote_statuses
+
+from .pagination import (
+    CAPPED,
+    EXACT,
+    paginate_by_cursor,
+    paginate_by_offset,
+    paginate_ranked,
+)
+from .randomizer import published_quote_ids, quote_decks
+from .replica import read_only, stick_to_primary
+from .response_cache import response_cache
+from .rows import QuoteRow
+from .search import (
+    build_headline,
+    build_tsquery,
+    clear_ranked_ids,
+    format_headline,
+    get_ranked_ids,
+    rank_matches,
+)
+from .stats import select_likers_stats, update_user_stats
+from .suggestions import quote_suggestions
+
+# the total random ids to try before falling back to `ORDER BY random()`
+RANDOM_QUOTE_ATTEMPTS = 3
+
+utcnow = datetime.utcnow
 
 PUBLISHED_STATUS_NAME = current_app.config['PUBLISHED_STATUS_NAME']
 
 
-def get_quotes(page, per_page, user_id=None, **filters):
+@read_only
+def get_quotes(page, per_page, user_id=None, cursor=None, **filters):
     """Returns paginated quotes, most recent first.
 
     Args:
@@ -22,76 +61,111 @@ def get_quotes(page, per_page, user_id=None, **filters):
         per_page (int): The total records to return on the page.
         user_id (int, optional): The user's id to determine if
             quotes are liked or not. Defaults to None.
+        cursor (object, optional): The `Cursor` to paginate from, `page`
+            is ignored when this is set. Defaults to None.
         filters (dict, optional): Filters to use in the query.
 
     Returns:
-        object: The `flask_sqlalchemy.Pagination` results for `Quote` model.
+        object: The `OffsetPagination` or `CursorPagination`
+            results of `QuoteRow`.
     """
 
     filter_queries = _get_filter_queries(**filters)
 
     query = (
         Quote.query
+        .with_entities(*QuoteRow.columns())
         .join(User)
-        .join(QuoteStatus)
         .filter(and_(*filter_queries))
-        .add_columns(case([(Like.quote_id.isnot(None), True)], else_=False).label('is_liked'))
-        .outerjoin(Like, (Like.quote_id == Quote.id) & (Like.user_id == user_id))
-        .order_by(Quote.created_at.desc())
     )
 
-    return _paginate_quote(query, page, per_page)
+    sort_keys = [Quote.created_at, Quote.id]
+    total_key = ('quotes', tuple(sorted(filters.items())))
+    result = _paginate_quote(query, page, per_page, sort_keys, cursor, total_key)
+
+    return _set_liked_rows(result, user_id)
+
 
+@read_only
+def search_quotes(search_query, page, per_page, user_id=None, cursor=None, highlight=False):
+    """Returns quotes that matches the given query, most relevant first.
 
-def search_quotes(search_query, page, per_page, user_id=None):
-    """Returns quotes that matches the given query.
+    The matches are ranked by `search.rank_matches`, the ranking is reused
+    by the follow-up pages for `SEARCH_RESULTS_CACHE_TTL` seconds and only
+    the best `SEARCH_MAX_RESULTS` matches are paginated.
 
     Args:
-        search_query (string): The query to use.
+        search_query (string): The query to use, its words are
+            also matched as prefixes.
         page (int): The page of the results to return.
         per_page (int): The total records to return on the page.
         user_id (int, optional): The user's id to determine if
             quotes are liked or not. Defaults to None.
+        cursor (object, optional): The `Cursor` to paginate from, `page`
+            is ignored when this is set. Defaults to None.
+        highlight (bool, optional): Sets the `highlight` of the quotes to
+            the quotation with the matches marked. Defaults to False.
+
+    Raises:
+        SearchUnavailableError: This will be raised if the full-text
+            matches can't be ranked, e.g. when it times out.
 
     Returns:
-        object: The `flask_sqlalchemy.Pagination` results for `Quote` model.
+        object: The `OffsetPagination` or `CursorPagination`
+            results of `QuoteRow`.
     """
 
-    query = (
-        Quote.query
-        .join(QuoteStatus)
-        .filter(QuoteStatus.name == PUBLISHED_STATUS_NAME)
-        .add_columns(case([(Like.quote_id.isnot(None), True)], else_=False).label('is_liked'))
-        .outerjoin(Like, (Like.quote_id == Quote.id) & (Like.user_id == user_id))
-        .search(search_query, sort=True)
+    # pylint: disable=too-many-arguments
+
+    if per_page is None:
+        per_page = current_app.config.get('QUOTES_PER_PAGE', 10)
+
+    tsquery = build_tsquery(search_query)
+    published_filter = Quote.status_id == _get_published_status_id()
+
+    ids = get_ranked_ids(
+        search_query, partial(rank_matches, search_query, tsquery, published_filter)
     )
 
-    return _paginate_quote(query, page, per_page)
+    max_results = current_app.config.get('SEARCH_MAX_RESULTS', 1000)
+    total_strategy = CAPPED if len(ids) >= max_results else EXACT
+    result = paginate_ranked(ids, page, per_page, cursor, total_strategy)
 
+    quotes = _get_ranked_rows(result.items, published_filter, tsquery if highlight else None)
 
-def get_user_liked_quotes(page, per_page, user_id=None):
-    """Returns user liked quotes.
+    # the quotes deleted or unpublished since the ranking are left out
+    result.items = [quotes[i] for i in result.items if i in quotes]
+
+    return _set_liked_rows(result, user_id)
+
+
+@read_only
+def get_user_liked_quotes(page, per_page, user_id=None, cursor=None):
+    """Returns user liked quotes, most recently liked first.
 
     Args:
         page (int): The page of the results to return.
         per_page (int): The total records to return on the page.
         user_id (int, optional): The user's id. Defaults to None.
+        cursor (object, optional): The `Cursor` to paginate from, `page`
+            is ignored when this is set. Defaults to None.
 
     Returns:
-        object: The `flask_sqlalchemy.Pagination` results for `Quote` model.
+        object: The `OffsetPagination` or `CursorPagination`
+            results of `QuoteRow`.
     """
 
     query = (
         Quote.query
-        .join(QuoteStatus)
-        .filter(QuoteStatus.name == PUBLISHED_STATUS_NAME)
-        .add_columns(case([(Like.quote_id.isnot(None), True)], else_=False).label('is_liked'))
+        .with_entities(*QuoteRow.columns())
+        .filter(Quote.status_id == _get_published_status_id())
+        .add_columns(literal(True).label('is_liked'))
         .join(Like, (Like.quote_id == Quote.id) & (Like.user_id == user_id))
-        .filter(Quote.total_likes > 0)
-        .order_by(Like.created_at.desc())
     )
 
-    return _paginate_quote(query, page, per_page)
+    sort_keys = [Like.created_at, Quote.id]
+    total_key = ('likes', user_id)
+    return _paginate_quote(query, page, per_page, sort_keys, cursor, total_key)
 
 
 def get_quote(quote_id, user_id=None):
@@ -121,6 +195,7 @@ def get_quote(quote_id, user_id=None):
     return _set_attributes(quote, is_liked=is_liked)
 
 
+@read_only
 def get_random_quote(user_id=None):
     """Returns random published quote.
 
@@ -132,10 +207,21 @@ def get_random_quote(user_id=None):
         object: The random quote's model.
     """
 
+    for _ in range(RANDOM_QUOTE_ATTEMPTS):
+        quote_id = published_quote_ids.choice()
+        if quote_id is None:
+            break
+
+        quote = get_quote(quote_id, user_id)
+        if quote and quote.status_id == _get_published_status_id():
+            return quote
+
+        # the id was deleted or unpublished by another process
+        published_quote_ids.invalidate()
+
     result = (
         Quote.query
-        .join(QuoteStatus)
-        .filter(QuoteStatus.name == PUBLISHED_STATUS_NAME)
+        .filter(Quote.status_id == _get_published_status_id())
         .add_columns(case([(Like.quote_id.isnot(None), True)], else_=False).label('is_liked'))
         .outerjoin(Like, (Like.quote_id == Quote.id) & (Like.user_id == user_id))
         .order_by(func.random())
@@ -149,6 +235,49 @@ def get_random_quote(user_id=None):
     return _set_attributes(quote, is_liked=is_liked)
 
 
+@read_only
+def get_deck_quote(deck_key, user_id=None):
+    """Returns the next published quote from a shuffled deck, a deck
+    doesn't repeat a quote until it runs out.
+
+    Args:
+        deck_key (string): The key of the user's or session's deck.
+        user_id (int, optional): The user's id to determine if
+            quote is liked or not. Defaults to None.
+
+    Returns:
+        object: The quote's model.
+    """
+
+    for _ in range(RANDOM_QUOTE_ATTEMPTS):
+        quote_id = quote_decks.draw(deck_key)
+        if quote_id is None:
+            break
+
+        quote = get_quote(quote_id, user_id)
+        if quote and quote.status_id == _get_published_status_id():
+            return quote
+
+    return get_random_quote(user_id)
+
+
+def suggest_quotes(query, limit=10):
+    """Returns the published quotes' authors and quotes matching the
+    query from the in-process index, as the user types.
+
+    Args:
+        query (string): The text typed by the user.
+        limit (int, optional): The maximum authors, and the maximum
+            quotes, to return. Defaults to 10.
+
+    Returns:
+        dict: The `authors` names and the `quotes` as dicts of
+            their `id`, `author` and `quotation`.
+    """
+
+    return quote_suggestions.suggest(query, limit)
+
+
 def update_quote(quote, data):
     """Updates quote.
 
@@ -186,6 +315,95 @@ def delete_quote(quote):
     quote.delete()
 
 
+def delete_quotes(quote_ids):
+    """Deletes quotes in a single statement and transaction.
+
+    Args:
+        quote_ids (list): The ids of the quotes to be deleted.
+
+    Returns:
+        set: The ids of the deleted quotes.
+    """
+
+    quote_table = Quote.__table__
+
+    # the likes are deleted by the database on cascade
+    update_user_stats(db.session, select_likers_stats(Like.quote_id.in_(quote_ids)))
+
+    result = db.session.execute(
+        quote_table
+        .delete()
+        .where(quote_table.c.id.in_(quote_ids))
+        .returning(quote_table.c.id, quote_table.c.contributor_id, quote_table.c.status_id)
+    )
+
+    rows = result.fetchall()
+    deleted_ids = {quote_id for quote_id, _, _ in rows}
+
+    published_status_id = _get_published_status_id()
+    contributor_ids = Counter(
+        contributor_id for _, contributor_id, status_id in rows
+        if status_id == published_status_id
+    )
+
+    if contributor_ids:
+        update_user_stats(db.session, [
+            {'user_id': user_id, 'total_likes': 0, 'total_submitted': -total}
+            for user_id, total in contributor_ids.items()
+        ])
+
+    if deleted_ids:
+        _mark_quotes_changed(db.session)
+
+    db.session.commit()
+
+    # bulk deletes bypass the `after_delete` event listener
+    for quote_id in deleted_ids:
+        published_quote_ids.discard(quote_id)
+        quote_suggestions.discard(quote_id)
+
+    return deleted_ids
+
+
+def flush_like_counters():
+    """Folds the pending like deltas into quote's `total_likes`, the
+    deltas are deleted and applied in a single statement so concurrent
+    flushes never apply the same delta twice.
+
+    Returns:
+        int: The total quotes updated.
+    """
+
+    delta_table = LikeDelta.__table__
+    quote_table = Quote.__table__
+
+    moved = (
+        delta_table
+        .delete()
+        .returning(delta_table.c.quote_id, delta_table.c.delta)
+        .cte('moved')
+    )
+    totals = (
+        select([moved.c.quote_id, func.sum(moved.c.delta).label('delta')])
+        .group_by(moved.c.quote_id)
+        .alias('totals')
+    )
+
+    result = db.session.execute(
+        quote_table
+        .update()
+        .where(quote_table.c.id == totals.c.quote_id)
+        .values(total_likes=func.greatest(quote_table.c.total_likes + totals.c.delta, 0))
+    )
+
+    if result.rowcount:
+        _mark_quotes_changed(db.session)
+
+    db.session.commit()
+
+    return result.rowcount
+
+
 def get_like(user_id, quote_id):
     """Returns the like for the given user and quote id.
 
@@ -200,6 +418,30 @@ def get_like(user_id, quote_id):
     return Like.get_by(first=True, user_id=user_id, quote_id=quote_id)
 
 
+@read_only
+def get_liked_quote_ids(user_id, quote_ids):
+    """Returns which of the given quotes are liked by the user.
+
+    Args:
+        user_id (int): The user's id.
+        quote_ids (list): The ids of the quotes to check.
+
+    Returns:
+        set: The ids of the liked quotes.
+    """
+
+    if user_id is None or not quote_ids:
+        return set()
+
+    query = (
+        select([Like.quote_id])
+        .where(Like.user_id == user_id)
+        .where(Like.quote_id == any_(_int_array(quote_ids)))
+    )
+
+    return {quote_id for quote_id, in db.session.execute(query)}
+
+
 def create_like(data):
     """Creates like.
 
@@ -223,32 +465,119 @@ def delete_like(like):
     like.delete()
 
 
-def get_user(firebase_user_id):
-    """Returns user by `firebase_user_id`
+def create_likes(user_id, quote_ids):
+    """Creates likes for the given quotes in a single statement, along with
+    their like deltas, ignoring the quotes already liked or not found.
 
     Args:
-        firebase_user_id (string): The firebase user id saved on the table.
+        user_id (int): The user's id.
+        quote_ids (list): The ids of the quotes to like.
 
     Returns:
-        object: The user's model.
+        set: The ids of the newly liked quotes.
     """
 
-    return User.get_by(first=True, firebase_user_id=firebase_user_id)
+    like_table = Like.__table__
+
+    inserted = (
+        insert(like_table)
+        .from_select(
+            ['user_id', 'quote_id', 'created_at'],
+            select([literal(user_id), Quote.id, literal(utcnow())])
+            .where(Quote.id.in_(quote_ids))
+        )
+        .on_conflict_do_nothing()
+        .returning(like_table.c.quote_id)
+        .cte('inserted')
+    )
+
+    liked_ids = _record_like_deltas(inserted, delta=1)
+    update_user_stats(db.session, [{
+        'user_id': user_id,
+        'total_likes': len(liked_ids),
+        'total_submitted': 0,
+    }])
+    db.session.commit()
+
+    return liked_ids
+
+
+def delete_likes(user_id, quote_ids):
+    """Deletes the likes of the given quotes in a single statement, along
+    with their like deltas, ignoring the quotes not liked.
+
+    Args:
+        user_id (int): The user's id.
+        quote_ids (list): The ids of the quotes to unlike.
+
+    Returns:
+        set: The ids of the unliked quotes.
+    """
+
+    like_table = Like.__table__
+
+    deleted = (
+        like_table
+        .delete()
+        .where(like_table.c.user_id == user_id)
+        .where(like_table.c.quote_id.in_(quote_ids))
+        .returning(like_table.c.quote_id)
+        .cte('deleted')
+    )
+
+    unliked_ids = _record_like_deltas(deleted, delta=-1)
+    update_user_stats(db.session, [{
+        'user_id': user_id,
+        'total_likes': -len(unliked_ids),
+        'total_submitted': 0,
+    }])
+    db.session.commit()
 
+    return unliked_ids
 
-def create_user(data):
-    """Creates user.
+
+def upsert_user(data):
+    """Creates the user, or refreshes its `name` and `picture_url` if
+    it already exists, in a single statement that also selects its stats.
 
     Args:
-        data (dict): Then data of the user that will be created.
+        data (dict): The data of the user, `firebase_user_id` is
+            the conflict target.
 
     Returns:
-        object: The created user's model.
+        object: The row of the created or updated user, with its
+            `total_likes` and `total_submitted`.
     """
 
-    return User.create(**data)
+    user_table = User.__table__
+    stats_table = UserStats.__table__
+
+    stmt = insert(user_table).values(**data)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[user_table.c.firebase_user_id],
+        set_={
+            'name': stmt.excluded.name,
+            'picture_url': stmt.excluded.picture_url,
+        },
+    )
+    upserted = stmt.returning(*user_table.c).cte('upserted')
+
+    query = (
+        select([
+            upserted,
+            func.coalesce(stats_table.c.total_likes, 0).label('total_likes'),
+            func.coalesce(stats_table.c.total_submitted, 0).label('total_submitted'),
+        ])
+        .select_from(upserted.outerjoin(stats_table, stats_table.c.user_id == upserted.c.id))
+    )
+
+    user = db.session.execute(query).first()
+    db.session.commit()
+
+    return user
 
 
+@read_only
 def get_user_by_id(user_id):
     """Returns user by id.
 
@@ -262,14 +591,102 @@ def get_user_by_id(user_id):
     return User.get(model_id=user_id)
 
 
+@read_only
+def get_quotes_version(user_id=None):
+    """Returns the version of the quotes and of the user's liked quotes,
+    both change whenever the quote endpoints' responses may change.
+
+    Args:
+        user_id (int, optional): The user's id. Defaults to None.
+
+    Returns:
+        tuple: The quotes version and the user's likes version.
+    """
+
+    sequence = table('quotes_version_seq', column('last_value'), column('is_called'))
+    stats_table = UserStats.__table__
+
+    likes_version = (
+        select([stats_table.c.likes_version])
+        .where(stats_table.c.user_id == user_id)
+        .as_scalar()
+    )
+
+    # `last_value` doesn't change on the first `nextval`, only `is_called` does
+    last_value, is_called, likes_version = db.session.execute(
+        select([sequence.c.last_value, sequence.c.is_called, likes_version])
+    ).first()
+
+    return (last_value, is_called), likes_version or 0
+
+
 def get_quote_statuses():
-    """Returns all quote statuses.
+    """Returns all quote statuses from the in-process registry.
+
+    Returns:
+        list: The list of quote statuses' `StatusRecord`.
+    """
+
+    return quote_statuses.all()
+
+
+def get_quote_status_id(name):
+    """Returns the id of the quote status with the given name.
+
+    Args:
+        name (string): The quote status' name.
+
+    Returns:
+        int: The quote status' id, or `None` if it doesn't exist.
+    """
+
+    return quote_statuses.get_id(name)
+
+
+def get_pool_stats():
+    """Returns the state and the metrics of this process' connection pool,
+    along with the connections allowed and open on the database for
+    sizing the workers' pools against them.
 
     Returns:
-        list: The list of quote statuses' model.
+        dict: The `pool` status, its `metrics`, the `replica`'s pool and
+            metrics, or `None` if not configured, and the `database`'s
+            `max_connections` and open `connections`.
     """
 
-    return QuoteStatus.query.all()
+    max_connections, connections = db.session.query(
+        func.current_setting('max_connections').cast(db.Integer),
+        select([func.count()])
+        .select_from(table('pg_stat_activity'))
+        .where(column('datname') == func.current_database())
+        .label('connections'),
+    ).one()
+
+    return {
+        'pid': os.getpid(),
+        'pool': get_pool_status(db.engine.pool),
+        'metrics': db.engine.pool.metrics.to_dict(),
+        'replica': _get_replica_pool_stats(),
+        'database': {
+            'max_connections': max_connections,
+            'connections': connections,
+        },
+    }
+
+
+def _get_replica_pool_stats():
+    """A helper that returns the state and the metrics of the replica's
+    connection pool, or `None` if the replica isn't configured."""
+
+    if REPLICA_BIND not in current_app.config['SQLALCHEMY_BINDS']:
+        return None
+
+    pool = db.get_engine(current_app, bind=REPLICA_BIND).pool
+
+    return {
+        'pool': get_pool_status(pool),
+        'metrics': pool.metrics.to_dict(),
+    }
 
 
 def _get_filter_queries(**filters):
@@ -277,8 +694,8 @@ def _get_filter_queries(**filters):
 
     filter_configs = {
         'status': {
-            'model': QuoteStatus,
-            'attribute': 'name',
+            'model': Quote,
+            'attribute': 'status_id',
             'value': PUBLISHED_STATUS_NAME,
         },
         'submitted_by': {
@@ -310,6 +727,9 @@ def _get_filter_queries(**filters):
         if not value:
             continue
 
+        if key == 'status':
+            value = quote_statuses.get_id(value)
+
         if key == 'likes':
             operator, value = _parse_likes_filter(value)
 
@@ -345,26 +765,122 @@ def _parse_likes_filter(string):
     return operator_map[operator], int(value)
 
 
-def _paginate_quote(query, page, per_page):
+def _mark_quotes_changed(session):
+    """A helper that bumps the quotes version once the session's
+    transaction is committed."""
+
+    session.info['quotes_changed'] = True
+
+
+def _record_like_deltas(likes, delta):
+    """A helper that records a like delta for each quote id returned
+    by the given like statement.
+
+    Args:
+        likes (object): The like INSERT or DELETE `CTE` returning `quote_id`.
+        delta (int): The change on each quote's `total_likes`.
+
+    Returns:
+        set: The quote ids returned by the like statement.
+    """
+
+    delta_table = LikeDelta.__table__
+
+    result = db.session.execute(
+        delta_table
+        .insert()
+        .from_select(['quote_id', 'delta'], select([likes.c.quote_id, literal(delta)]))
+        .returning(delta_table.c.quote_id)
+    )
+
+    return {quote_id for quote_id, in result}
+
+
+def _get_published_status_id():
+    """Returns the id of the published quote status."""
+
+    return quote_statuses.get_id(PUBLISHED_STATUS_NAME)
+
+
+def _paginate_quote(query, page, per_page, sort_keys, cursor=None, total_key=None):
     """A helper for paginating quote query.
 
     Args:
-        query (object): The quote models `SearchQuery`.
+        query (object): The unordered `SearchQuery` of the `QuoteRow`
+            columns, and optionally `is_liked`.
         page (int): The page of the results to return.
         per_page (int): The total records to return on the page.
+        sort_keys (list): The unique combination of columns to sort
+            the results by, in descending order.
+        cursor (object, optional): The `Cursor` to paginate from, uses
+            offset pagination if not set. Defaults to None.
+        total_key (object, optional): The hashable key identifying the
+            filter combination, used for caching the total. Defaults to None.
 
     Returns:
-        object: The `flask_sqlalchemy.Pagination` results for `Quote` model.
+        object: The `OffsetPagination` or `CursorPagination`
+            results of `QuoteRow`.
 
     """
 
     if per_page is None:
         per_page = current_app.config.get('QUOTES_PER_PAGE', 10)
 
-    result = query.paginate(page, per_page, error_out=True)
-    result.items = [
-        _set_attributes(quote, is_liked=is_liked) for quote, is_liked in result.items
-    ]
+    if cursor is not None:
+        result = paginate_by_cursor(query, sort_keys, cursor, per_page)
+    else:
+        query = query.order_by(*[key.desc() for key in sort_keys])
+        result = paginate_by_offset(query, page, per_page, total_key)
+
+    result.items = [QuoteRow(*row) for row in result.items]
+
+    return result
+
+
+def _get_ranked_rows(ids, published_filter, tsquery=None):
+    """A helper that returns the published quotes of the given ids as
+    `QuoteRow` by id, with the matches of the `tsquery` marked in their
+    `highlight` if set."""
+
+    if not ids:
+        return {}
+
+    columns = QuoteRow.columns()
+    if tsquery is not None:
+        columns.append(build_headline(Quote.quotation, tsquery))
+
+    rows = (
+        Quote.query
+        .with_entities(*columns)
+        .filter(published_filter)
+        .filter(Quote.id == any_(_int_array(ids)))
+        .all()
+    )
+
+    if tsquery is None:
+        return {row.id: QuoteRow(*row) for row in rows}
+
+    return {
+        row.id: QuoteRow(*row[:-1], highlight=format_headline(row[-1]))
+        for row in rows
+    }
+
+
+def _int_array(values):
+    """A helper that returns the values as a single integer array
+    parameter, e.g. for `column == any_(...)`."""
+
+    return literal(list(values), ARRAY(db.Integer))
+
+
+def _set_liked_rows(result, user_id):
+    """A helper that marks the rows of the paginated result liked by the
+    user, the rows are selected without the user's likes so the same
+    page is shared by every user."""
+
+    liked_ids = get_liked_quote_ids(user_id, [row.id for row in result.items])
+    for row in result.items:
+        row.is_liked = row.id in liked_ids
 
     return result
 
@@ -380,25 +896,87 @@ def _set_attributes(obj, **kwargs):
 
 @event.listens_for(Like, 'after_insert')
 def increment_quote_likes(_, connection, target):
-    """An event listener that increments quote's `total_like`
-    when like is created."""
+    """An event listener that records an increment of quote's and
+    user's `total_likes` when like is created."""
 
-    quote_table = Quote.__table__
     connection.execute(
-        quote_table
-        .update(Quote.id == target.quote_id)
-        .values(total_likes=Quote.total_likes + 1)
+        LikeDelta.__table__
+        .insert()
+        .values(quote_id=target.quote_id, delta=1)
     )
+    update_user_stats(connection, [
+        {'user_id': target.user_id, 'total_likes': 1, 'total_submitted': 0}
+    ])
 
 
 @event.listens_for(Like, 'after_delete')
 def decrement_quote_likes(_, connection, target):
-    """An event listener that decrements quote's `total_like`
-    when like is deleted."""
+    """An event listener that records a decrement of quote's and
+    user's `total_likes` when like is deleted."""
 
-    quote_table = Quote.__table__
     connection.execute(
-        quote_table
-        .update(and_(Quote.id == target.quote_id, Quote.total_likes > 0))
-        .values(total_likes=Quote.total_likes - 1)
+        LikeDelta.__table__
+        .insert()
+        .values(quote_id=target.quote_id, delta=-1)
     )
+    update_user_stats(connection, [
+        {'user_id': target.user_id, 'total_likes': -1, 'total_submitted': 0}
+    ])
+
+
+@event.listens_for(Quote, 'after_insert')
+@event.listens_for(Quote, 'after_update')
+@event.listens_for(Quote, 'after_delete')
+@event.listens_for(QuoteStatus, 'after_insert')
+@event.listens_for(QuoteStatus, 'after_update')
+@event.listens_for(QuoteStatus, 'after_delete')
+def mark_quotes_changed(_, __, target):
+    """An event listener that marks the quotes as changed when
+    quote or quote status is written."""
+
+    _mark_quotes_changed(object_session(target))
+
+
+@event.listens_for(db.session, 'after_bulk_update')
+@event.listens_for(db.session, 'after_bulk_delete')
+def mark_quotes_bulk_changed(context):
+    """An event listener that marks the quotes as changed when quotes
+    are updated or deleted with `Query.update` or `Query.delete`."""
+
+    if context.mapper.class_ in (Quote, QuoteStatus):
+        _mark_quotes_changed(context.session)
+
+
+@event.listens_for(db.session, 'after_commit')
+def bump_quotes_version(session):
+    """An event listener that bumps the quotes version after the
+    transaction that changed the quotes is committed, so a reader that
+    sees the new version also sees the changes.
+
+    The cached responses are keyed by the version so they're already
+    stale, they're cleared to free their memory early. The cached search
+    rankings are cleared so this worker's next searches see the changes.
+    """
+
+    if session.info.pop('quotes_changed', False):
+        # the session can't emit SQL once it's committed
+        db.engine.execute(select([quotes_version.next_value()]))
+        response_cache.clear()
+        clear_ranked_ids()
+
+
+@event.listens_for(db.session, 'after_commit')
+def stick_writer_to_primary(session):
+    """An event listener that lets the client that wrote read its writes
+    from the primary until the replica catches up."""
+
+    if session.has_writes:
+        stick_to_primary()
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def forget_quotes_changed(session, _):
+    """An event listener that drops the quotes changes of
+    a transaction that is rolled back."""
+
+    session.info.pop('quotes_changed', None)
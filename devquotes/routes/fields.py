@@ -51,14 +51,83 @@ quote_fields = {
 }
 
 quotes_fields = {
-    'curr_page': fields.Integer(attribute='page'),
+    'curr_page': fields.Integer(attribute='page', default=None),
     'next_page': PaginationUrl(attribute='next_num'),
     'prev_page': PaginationUrl(attribute='prev_num'),
+    'next_cursor': fields.String(attribute='next_cursor'),
+    'prev_cursor': fields.String(attribute='prev_cursor'),
     'per_page': fields.Integer(attribute='per_page'),
-    'total': fields.Integer(attribute='total'),
+    'total': fields.Integer(attribute='total', default=None),
+    'total_strategy': fields.String(attribute='total_strategy'),
     'data': fields.List(fields.Nested(quote_fields), attribute='items'),
 }
 
+highlighted_quote_fields = {
+    'data': {
+        **quote_fields['data'],
+        'highlight': fields.String,
+    }
+}
+
+highlighted_quotes_fields = {
+    **quotes_fields,
+    'data': fields.List(fields.Nested(highlighted_quote_fields), attribute='items'),
+}
+
+suggestions_fields = {
+    'data': {
+        'authors': fields.List(fields.String),
+        'quotes': fields.List(fields.Nested({
+            'id': fields.Integer,
+            'author': fields.String,
+            'quotation': fields.String,
+        })),
+    }
+}
+
+pool_status_fields = {
+    'size': fields.Integer,
+    'max_overflow': fields.Integer,
+    'timeout': fields.Float,
+    'checked_in': fields.Integer,
+    'checked_out': fields.Integer,
+    'overflow': fields.Integer,
+}
+
+pool_metrics_fields = {
+    'checkouts': fields.Integer,
+    'timeouts': fields.Integer,
+    'overflow_checkouts': fields.Integer,
+    'peak_overflow': fields.Integer,
+    'connects': fields.Integer,
+    'invalidations': fields.Integer,
+    'soft_invalidations': fields.Integer,
+    'latency': fields.Nested({
+        'sum': fields.Float,
+        'max': fields.Float,
+        'buckets': fields.List(fields.Nested({
+            'le': fields.Float,
+            'count': fields.Integer,
+        })),
+    }),
+}
+
+pool_fields = {
+    'data': {
+        'pid': fields.Integer,
+        'pool': fields.Nested(pool_status_fields),
+        'metrics': fields.Nested(pool_metrics_fields),
+        'replica': fields.Nested({
+            'pool': fields.Nested(pool_status_fields),
+            'metrics': fields.Nested(pool_metrics_fields),
+        }, allow_null=True),
+        'database': fields.Nested({
+            'max_connections': fields.Integer,
+            'connections': fields.Integer,
+        }),
+    }
+}
+
 quote_status_fields = {
     'data': {
         'id': fields.Integer,
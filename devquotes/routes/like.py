@@ -5,7 +5,6 @@ from flask_jwt_extended import (
     jwt_required,
 )
 from flask_restful import (
-    marshal_with,
     reqparse,
     Resource,
 )
@@ -13,7 +12,11 @@ from sqlalchemy.exc import IntegrityError
 
 from . import db_client
 from .fields import quote_fields, quotes_fields
-from .utils import get_quote_or_404
+from .serializers import marshal_with
+from .pagination import decode_cursor
+from .utils import comma_separated_ids, get_quote_or_404
+
+TOTAL_ALLOWED_IDS = 100
 
 
 class Likes(Resource):
@@ -28,12 +31,16 @@ class Likes(Resource):
         parser = reqparse.RequestParser()
         parser.add_argument('page', type=int, location='args')
         parser.add_argument('per_page', type=int, location='args')
+        parser.add_argument('cursor', type=decode_cursor, location='args')
         args = parser.parse_args()
         page = args['page']
         per_page = args['per_page']
+        cursor = args['cursor']
 
         current_user = get_jwt_identity()
-        return db_client.get_user_liked_quotes(page, per_page, current_user['id'])
+        return db_client.get_user_liked_quotes(
+            page, per_page, current_user['id'], cursor=cursor
+        )
 
     @classmethod
     @marshal_with(quote_fields)
@@ -80,3 +87,45 @@ class Like(Resource):
 
         quote.is_liked = False
         return quote
+
+
+class LikesBatch(Resource):
+    """Resource for liking and unliking multiple quotes at once."""
+
+    @classmethod
+    @jwt_required
+    def post(cls):
+        """Creates likes for the current user."""
+
+        parser = reqparse.RequestParser()
+        parser.add_argument(
+            'ids',
+            location=('json', 'form'),
+            required=True,
+            type=comma_separated_ids(TOTAL_ALLOWED_IDS),
+        )
+        args = parser.parse_args()
+
+        current_user = get_jwt_identity()
+        liked_ids = db_client.create_likes(current_user['id'], args['ids'])
+
+        return [{'id': i, 'success': i in liked_ids} for i in args['ids']]
+
+    @classmethod
+    @jwt_required
+    def delete(cls):
+        """Deletes likes from the current user."""
+
+        parser = reqparse.RequestParser()
+        parser.add_argument(
+            'ids',
+            location='args',
+            required=True,
+            type=comma_separated_ids(TOTAL_ALLOWED_IDS),
+        )
+        args = parser.parse_args()
+
+        current_user = get_jwt_identity()
+        unliked_ids = db_client.delete_likes(current_user['id'], args['ids'])
+
+        return [{'id': i, 'success': i in unliked_ids} for i in args['ids']]
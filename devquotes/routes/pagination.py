@@ -0,0 +1,353 @@
+"""This module contains the offset and keyset (cursor) pagination helpers."""
+
+import base64
+import binascii
+import json
+from collections import namedtuple
+from datetime import datetime
+
+from flask import current_app
+from flask_restful import abort
+from flask_sqlalchemy import Pagination
+from sqlalchemy import literal, tuple_
+
+from .cache import LRUCache
+
+NEXT = 'next'
+PREV = 'prev'
+
+# the strategies for computing the `total` of offset paginated results
+EXACT = 'exact'  # runs a COUNT on every page
+CACHED = 'cached'  # caches the exact COUNT per filter combination
+ESTIMATED = 'estimated'  # uses the planner's row estimate
+OMITTED = 'omitted'  # doesn't compute the total at all
+TOTAL_STRATEGIES = (EXACT, CACHED, ESTIMATED, OMITTED)
+
+# the total of the ranked results that hit their cap, there may be more
+CAPPED = 'capped'
+
+_total_cache = LRUCache(maxsize=1024)
+
+Cursor = namedtuple('Cursor', ['values', 'direction'])
+
+
+def check_total_strategy(config):
+    """Checks the app's `QUOTES_TOTAL_STRATEGY` when the app is created,
+    instead of on the first paginated request.
+
+    Args:
+        config (dict): The app's config.
+
+    Raises:
+        ValueError: If the strategy isn't one of `TOTAL_STRATEGIES`.
+    """
+
+    strategy = config.get('QUOTES_TOTAL_STRATEGY', EXACT)
+    if strategy not in TOTAL_STRATEGIES:
+        raise ValueError(
+            f'Unknown quotes total strategy: {strategy}, '
+            f'must be one of {", ".join(TOTAL_STRATEGIES)}'
+        )
+
+
+class OffsetPagination(Pagination):
+    """A `flask_sqlalchemy.Pagination` whose `total` may be approximated
+    or omitted, it tells whether a next page exists without relying on it.
+    """
+
+    def __init__(self, query, page, per_page, total, items, has_next, total_strategy):
+        # pylint: disable=too-many-arguments
+        super().__init__(query, page, per_page, total, items)
+        self._has_next = has_next
+        self.total_strategy = total_strategy
+
+    @property
+    def has_next(self):
+        """Returns `True` if a next page exists, without relying on `total`."""
+
+        return self._has_next
+
+
+class CursorPagination:
+    """The keyset counterpart of `flask_sqlalchemy.Pagination`.
+
+    The offset related attributes are always `None` and are only
+    defined so the results can be marshalled with `quotes_fields`.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    page = None
+    total = None
+    total_strategy = OMITTED
+    next_num = None
+    prev_num = None
+
+    def __init__(self, items, per_page, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+
+def encode_cursor(values, direction=NEXT):
+    """Returns an opaque cursor for the given key values.
+
+    Args:
+        values (list): The values of the sort keys of the boundary row.
+        direction (string, optional): Either `next` or `prev`.
+            Defaults to `next`.
+
+    Returns:
+        string: The url-safe cursor.
+    """
+
+    values = [
+        value.isoformat() if isinstance(value, datetime) else value
+        for value in values
+    ]
+
+    payload = json.dumps([values, direction], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(string):
+    """Parses the cursor sent by the client, an empty string
+    points to the first page.
+
+    Args:
+        string (string): The cursor to parse.
+
+    Raises:
+        ValueError: This will be raised if the cursor is malformed.
+
+    Returns:
+        object: The `Cursor` tuple.
+    """
+
+    if not string:
+        return Cursor(None, NEXT)
+
+    try:
+        payload = base64.urlsafe_b64decode(string.encode())
+        values, direction = json.loads(payload)
+    except (binascii.Error, TypeError, ValueError):
+        raise ValueError('Invalid cursor') from None
+
+    if not isinstance(values, list) or direction not in (NEXT, PREV):
+        raise ValueError('Invalid cursor')
+
+    return Cursor(values, direction)
+
+
+def paginate_by_offset(query, page, per_page, total_key=None):
+    """Paginates the query by offset, the `total` is computed with the
+    app's `QUOTES_TOTAL_STRATEGY`.
+
+    This follows the `error_out` rules of `flask_sqlalchemy` paginate
+    but fetches an extra row to tell if a next page exists.
+
+    Args:
+        query (object): The ordered query to paginate.
+        page (int): The page of the results to return.
+        per_page (int): The total records to return on the page.
+        total_key (object, optional): The hashable key identifying the
+            query's filter combination, required by the `cached` strategy
+            which falls back to `exact` without it. Defaults to None.
+
+    Returns:
+        object: The `OffsetPagination` results, its items are the rows
+            of the given query.
+    """
+
+    if page is None:
+        page = 1
+
+    if page < 1 or per_page < 0:
+        abort(404)
+
+    rows = query.limit(per_page + 1).offset((page - 1) * per_page).all()
+    if not rows and page != 1:
+        abort(404)
+
+    has_next = len(rows) > per_page
+    items = rows[:per_page]
+
+    strategy = current_app.config.get('QUOTES_TOTAL_STRATEGY', EXACT)
+    if strategy == CACHED and total_key is None:
+        strategy = EXACT
+
+    total = None
+    if strategy == EXACT:
+        total = _count_total(query)
+    elif strategy == CACHED:
+        total = _get_cached_total(query, total_key)
+    elif strategy == ESTIMATED:
+        total = _estimate_total(query)
+
+    return OffsetPagination(query, page, per_page, total, items, has_next, strategy)
+
+
+def paginate_by_cursor(query, keys, cursor, per_page):
+    """Paginates the query by seeking past the cursor's key values
+    instead of using an offset.
+
+    Args:
+        query (object): The unordered query to paginate.
+        keys (list): The unique combination of columns to sort the
+            results by, in descending order.
+        cursor (object): The `Cursor` returned by `decode_cursor`.
+        per_page (int): The total records to return on the page.
+
+    Returns:
+        object: The `CursorPagination` results, its items are the rows
+            of the given query.
+    """
+
+    total_keys = len(keys)
+    is_prev = cursor.direction == PREV
+
+    query = query.add_columns(*keys)
+    if cursor.values is not None:
+        values = _parse_key_values(keys, cursor.values)
+        boundary = tuple_(*[literal(v, k.type) for k, v in zip(keys, values)])
+        operator = tuple_(*keys).__gt__ if is_prev else tuple_(*keys).__lt__
+        query = query.filter(operator(boundary))
+
+    query = query.order_by(*[key.asc() if is_prev else key.desc() for key in keys])
+    rows = query.limit(per_page + 1).all()
+
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if is_prev:
+        rows.reverse()
+
+    next_cursor = prev_cursor = None
+    if rows:
+        first_values = rows[0][-total_keys:]
+        last_values = rows[-1][-total_keys:]
+
+        if is_prev or has_more:
+            next_cursor = encode_cursor(last_values, NEXT)
+
+        if (is_prev and has_more) or (not is_prev and cursor.values is not None):
+            prev_cursor = encode_cursor(first_values, PREV)
+
+    items = [row[:-total_keys] for row in rows]
+    return CursorPagination(items, per_page, next_cursor, prev_cursor)
+
+
+def paginate_ranked(ids, page, per_page, cursor=None, total_strategy=EXACT):
+    """Paginates the already ranked ids, by offset or by cursor, the
+    cursors point to positions in the ranking.
+
+    Args:
+        ids (list): The ranked ids.
+        page (int): The page of the results to return.
+        per_page (int): The total records to return on the page.
+        cursor (object, optional): The `Cursor` to paginate from, uses
+            offset pagination if not set. Defaults to None.
+        total_strategy (string, optional): How the total of the ids is
+            reported. Defaults to `exact`.
+
+    Returns:
+        object: The `OffsetPagination` or `CursorPagination` results,
+            its items are the ids of the page.
+    """
+
+    total = len(ids)
+
+    if cursor is None:
+        if page is None:
+            page = 1
+
+        if page < 1 or per_page < 0:
+            abort(404)
+
+        start = (page - 1) * per_page
+        items = list(ids[start:start + per_page])
+        if not items and page != 1:
+            abort(404)
+
+        has_next = total > start + per_page
+        return OffsetPagination(None, page, per_page, total, items, has_next, total_strategy)
+
+    start = 0
+    if cursor.values is not None:
+        start = _parse_position(cursor.values, total)
+        if cursor.direction == PREV:
+            start = max(start - per_page, 0)
+
+    end = start + per_page
+    next_cursor = encode_cursor([end], NEXT) if end < total else None
+    prev_cursor = encode_cursor([start], PREV) if start > 0 else None
+
+    return CursorPagination(list(ids[start:end]), per_page, next_cursor, prev_cursor)
+
+
+def _parse_position(values, total):
+    """Returns the position in the ranking of the decoded cursor values,
+    aborts with 400 if they're not a position. The ranking may have
+    shrunk since the cursor was made, the position is kept within it."""
+
+    position = values[0] if len(values) == 1 else None
+    if not isinstance(position, int) or isinstance(position, bool) or position < 0:
+        abort(400, message='Invalid cursor')
+
+    return min(position, total)
+
+
+def _parse_key_values(keys, values):
+    """Converts the decoded cursor values to the python type
+    of their sort key, aborts with 400 if the values don't fit."""
+
+    if len(keys) != len(values):
+        abort(400, message='Invalid cursor')
+
+    parsed_values = []
+    for key, value in zip(keys, values):
+        python_type = key.type.python_type
+
+        try:
+            if python_type is datetime:
+                value = datetime.fromisoformat(value)
+            else:
+                value = python_type(value)
+        except (TypeError, ValueError):
+            abort(400, message='Invalid cursor')
+
+        parsed_values.append(value)
+
+    return parsed_values
+
+
+def _count_total(query):
+    """Returns the exact total rows of the query."""
+
+    return query.order_by(None).count()
+
+
+def _get_cached_total(query, key):
+    """Returns the exact total rows of the query, cached under the
+    given `key` for `QUOTES_TOTAL_CACHE_TTL` seconds."""
+
+    total = _total_cache.get(key)
+    if total is None:
+        total = _count_total(query)
+        ttl = current_app.config.get('QUOTES_TOTAL_CACHE_TTL', 60)
+        _total_cache.set(key, total, ttl=ttl)
+
+    return total
+
+
+def _estimate_total(query):
+    """Returns the planner's estimated total rows of the query."""
+
+    connection = query.session.connection()
+    compiled = query.order_by(None).statement.compile(dialect=connection.dialect)
+
+    plan = connection.execute(
+        f'EXPLAIN (FORMAT JSON) {compiled}', compiled.params
+    ).scalar()
+
+    return int(plan[0]['Plan']['Plan Rows'])
@@ -0,0 +1,23 @@
+"""This module contains the connection pool metrics API."""
+
+from flask_jwt_extended import jwt_required
+from flask_restful import Resource
+
+from . import db_client
+from .fields import pool_fields
+from .serializers import marshal_with
+from .utils import admin_only
+
+
+class Pool(Resource):
+    """Resource for the connection pool metrics."""
+
+    @classmethod
+    @marshal_with(pool_fields)
+    @jwt_required
+    @admin_only
+    def get(cls):
+        """Returns the state and the metrics of the connection pool of
+        the worker serving the request."""
+
+        return db_client.get_pool_stats()
@@ -1,7 +1,11 @@
 """This module contains the quotes API."""
 
+import json
 import re
+import secrets
+from urllib.parse import urlencode
 
+from flask import request, session
 from flask_jwt_extended import (
     get_jwt_identity,
     jwt_optional,
@@ -9,25 +13,42 @@ from flask_jwt_extended import (
 )
 from flask_restful import (
     abort,
-    marshal_with,
+    inputs,
     reqparse,
     Resource,
 )
 from sqlalchemy.exc import IntegrityError
 
 from . import db_client
-from .fields import quote_fields, quotes_fields, user_fields
-from .utils import admin_only, get_quote_or_404
+from .conditional import etag_headers, get_quotes_etag, is_not_modified, not_modified
+from .fields import (
+    highlighted_quotes_fields,
+    quote_fields,
+    quotes_fields,
+    suggestions_fields,
+    user_fields,
+)
+from .pagination import decode_cursor
+from .response_cache import (
+    cache_control_headers,
+    cached_response,
+    json_response,
+    response_cache,
+)
+from .search import SearchUnavailableError
+from .serializers import marshal, marshal_with
+from .utils import admin_only, comma_separated_ids, get_quote_or_404
 
 LIKES_FILTER_RE = re.compile(r'^(?P<operator>[g|l|e]t)(?P<value>\d*)$')
-TOTAL_ALLOWED_IDS = 50
+TOTAL_ALLOWED_IDS = 500
+RANDOM_MODES = ['random', 'deck']
+MAX_SUGGESTIONS = 25
 
 
 class Quotes(Resource):
     """Resource for quotes."""
 
     @classmethod
-    @marshal_with(quotes_fields)
     @jwt_optional
     def get(cls):
         """Returns quotes with regards to the given query parameters."""
@@ -45,8 +66,10 @@ class Quotes(Resource):
 
         parser = reqparse.RequestParser()
         parser.add_argument('query', location='args')
+        parser.add_argument('highlight', location='args', type=inputs.boolean, default=False)
         parser.add_argument('page', location='args', type=int)
         parser.add_argument('per_page', location='args', type=int)
+        parser.add_argument('cursor', location='args', type=decode_cursor)
         parser.add_argument('status', location='args', choices=status_choices)
         parser.add_argument('submitted_by', location='args')
         parser.add_argument(
@@ -54,9 +77,9 @@ class Quotes(Resource):
         )
         args = parser.parse_args()
 
-        search_query = args['query']
         page = args['page']
         per_page = args['per_page']
+        cursor = args['cursor']
         status = args['status']
         likes = args['likes']
         submitted_by = args['submitted_by']
@@ -67,16 +90,46 @@ class Quotes(Resource):
             # restricted arguments
             abort(403)
 
-        if search_query:
-            return db_client.search_quotes(search_query, page, per_page, user_id)
+        request_key = _get_request_key()
+        versions = db_client.get_quotes_version(user_id)
+
+        etag = get_quotes_etag(user_id, request_key, versions=versions)
+        if is_not_modified(etag):
+            return not_modified(etag)
+
+        headers = {**etag_headers(etag), **cache_control_headers(user_id)}
+
+        # the page is the same for everyone but `is_liked`, it's shared
+        # through the response cache under the anonymous ETag and the
+        # user's likes are laid over it
+        page_key = get_quotes_etag(None, request_key, versions=(versions[0], 0))
 
-        filters = {
-            'status': status,
-            'submitted_by': submitted_by,
-            'likes': likes,
-        }
+        body = response_cache.get(page_key)
+        if body is None:
+            page_fields = quotes_fields
+            if args['query']:
+                result, page_fields = _get_search_page(args)
+            else:
+                filters = {
+                    'status': status,
+                    'submitted_by': submitted_by,
+                    'likes': likes,
+                }
+                result = db_client.get_quotes(page, per_page, cursor=cursor, **filters)
 
-        return db_client.get_quotes(page, per_page, user_id, **filters)
+            body = json_response(marshal(result, page_fields), {}).get_data()
+            response_cache.set(page_key, body)
+
+        if user_id is None:
+            return cached_response(body, headers)
+
+        data = json.loads(body)
+        quotes = [item['data'] for item in data['data']]
+        liked_ids = db_client.get_liked_quote_ids(user_id, [quote['id'] for quote in quotes])
+        for quote in quotes:
+            quote['is_liked'] = quote['id'] in liked_ids
+
+        return json_response(data, headers)
 
     @classmethod
     @marshal_with(quote_fields)
@@ -124,9 +177,7 @@ class Quotes(Resource):
             if current_user['is_admin'] else 'pending_review'
 
         if status:
-            for curr_status in statuses:
-                if curr_status.name == status:
-                    args['status'] = curr_status
+            args['status_id'] = db_client.get_quote_status_id(status)
 
         try:
             return db_client.create_quote(args), 201
@@ -140,23 +191,15 @@ class Quotes(Resource):
         """Deletes quote."""
 
         parser = reqparse.RequestParser()
-        parser.add_argument('ids', location='args', type=_ids)
+        parser.add_argument(
+            'ids', location='args', type=comma_separated_ids(TOTAL_ALLOWED_IDS)
+        )
         args = parser.parse_args()
 
         ids = args['ids']
-        results = []
+        deleted_ids = db_client.delete_quotes(ids)
 
-        for quote_id in ids.split(','):
-            quote = db_client.get_quote(quote_id)
-            success = False
-
-            if quote:
-                success = True
-                db_client.delete_quote(quote)
-
-            results.append({'id': int(quote_id), 'success': success})
-
-        return results
+        return [{'id': i, 'success': i in deleted_ids} for i in ids]
 
 
 class Quote(Resource):
@@ -171,7 +214,11 @@ class Quote(Resource):
         current_user = get_jwt_identity()
         user_id = current_user['id'] if current_user else None
 
-        return get_quote_or_404(quote_id, user_id)
+        etag = get_quotes_etag(user_id, quote_id)
+        if is_not_modified(etag):
+            return not_modified(etag)
+
+        return get_quote_or_404(quote_id, user_id), 200, etag_headers(etag)
 
     @classmethod
     @marshal_with(quote_fields)
@@ -216,9 +263,7 @@ class Quote(Resource):
 
         status = args.pop('status', None)
         if status:
-            for curr_status in statuses:
-                if curr_status.name == status:
-                    args['status'] = curr_status
+            args['status_id'] = db_client.get_quote_status_id(status)
 
         current_user = get_jwt_identity()
         quote = get_quote_or_404(quote_id, current_user['id'])
@@ -245,16 +290,52 @@ class Random(Resource):
     @marshal_with(quote_fields)
     @jwt_optional
     def get(cls):
-        """Returns a random quote."""
+        """Returns a random quote, on `deck` mode the quotes are not
+        repeated until all the published quotes are returned."""
+
+        parser = reqparse.RequestParser()
+        parser.add_argument(
+            'mode', location='args', choices=RANDOM_MODES, default='random'
+        )
+        args = parser.parse_args()
 
         current_user = get_jwt_identity()
         user_id = current_user['id'] if current_user else None
 
-        quote = db_client.get_random_quote(user_id)
+        deck_key = _get_deck_key(user_id) if args['mode'] == 'deck' else None
+        if deck_key is not None:
+            quote = db_client.get_deck_quote(deck_key, user_id)
+        else:
+            quote = db_client.get_random_quote(user_id)
+
         if quote is None:
             abort(404)
 
-        return quote
+        # the same ETag as the quote's, a client that already has
+        # the picked quote doesn't download it again
+        etag = get_quotes_etag(user_id, quote.id)
+        if is_not_modified(etag):
+            return not_modified(etag)
+
+        return quote, 200, etag_headers(etag)
+
+
+class Suggestions(Resource):
+    """Resource for the suggested authors and quotes."""
+
+    @classmethod
+    @marshal_with(suggestions_fields)
+    def get(cls):
+        """Returns the authors and the quotes whose words start with the
+        words of `q`, for suggesting them as the user types."""
+
+        parser = reqparse.RequestParser()
+        parser.add_argument('q', location='args', default='')
+        parser.add_argument('limit', location='args', type=int, default=10)
+        args = parser.parse_args()
+
+        limit = min(max(args['limit'], 1), MAX_SUGGESTIONS)
+        return db_client.suggest_quotes(args['q'], limit)
 
 
 class Contributor(Resource):
@@ -271,6 +352,73 @@ class Contributor(Resource):
         return quote.contributor
 
 
+def _get_request_key():
+    """A helper that returns the request's path and query parameters,
+    sorted so the same query always has the same key.
+
+    Returns:
+        string: The request key.
+    """
+
+    args = sorted(request.args.items(multi=True))
+    return f'{request.path}?{urlencode(args)}'
+
+
+def _get_search_page(args):
+    """A helper that returns the page of the quotes matching the `query`
+    argument and the fields to marshal it with, it aborts with 503 if the
+    matches can't be ranked.
+
+    Args:
+        args (dict): The parsed arguments of `Quotes.get`.
+
+    Returns:
+        tuple: The `OffsetPagination` or `CursorPagination` results
+            and their fields.
+    """
+
+    try:
+        result = db_client.search_quotes(
+            args['query'],
+            args['page'],
+            args['per_page'],
+            cursor=args['cursor'],
+            highlight=args['highlight'],
+        )
+    except SearchUnavailableError:
+        abort(503)
+
+    if args['highlight']:
+        return result, highlighted_quotes_fields
+
+    return result, quotes_fields
+
+
+def _get_deck_key(user_id=None):
+    """A helper that returns the key of the current user's deck of quotes,
+    anonymous users are identified by a token on their session.
+
+    A client that sent no session cookie may never send one, it's given
+    a token for its next requests but it has no deck yet, otherwise each
+    of its requests would shuffle a deck that's never drawn from again.
+
+    Args:
+        user_id (int, optional): The user's id. Defaults to None.
+
+    Returns:
+        string: The deck key, or `None` if the client has no deck.
+    """
+
+    if user_id is not None:
+        return f'user:{user_id}'
+
+    if 'deck_id' not in session:
+        session['deck_id'] = secrets.token_urlsafe(16)
+        return None
+
+    return f'session:{session["deck_id"]}'
+
+
 def _non_empty_string(string):
     """A helper to check if the given string is empty.
 
@@ -308,31 +456,3 @@ def _valid_likes_pattern(string):
         raise ValueError(f'Invalid pattern, must follow {pattern}')
 
     return string
-
-
-def _ids(string):
-    """A helper to check if the given comma-separated ids are all integer
-    and does not exceed the allowed total ids.
-
-    Args:
-        string (string): The string to check.
-
-    Raises:
-        ValueError: This will be raised with an appropriate message.
-
-    Returns:
-        string: The string.
-    """
-
-    ids = set(string.split(','))
-
-    if not all(i.isdigit() for i in ids):
-        raise ValueError('Invalid type, each id must be type of integer')
-
-    if len(ids) > TOTAL_ALLOWED_IDS:
-        raise ValueError(
-            f'A total of {TOTAL_ALLOWED_IDS} '
-            f'{"ids are" if TOTAL_ALLOWED_IDS > 1 else "id is"} allowed'
-        )
-
-    return string
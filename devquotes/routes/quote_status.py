@@ -1,10 +1,11 @@
 """This module contains the quote statuses API."""
 
 from flask_jwt_extended import jwt_required
-from flask_restful import marshal_with, Resource
+from flask_restful import Resource
 
 from . import db_client
 from .fields import quotes_statuses_fields
+from .serializers import marshal_with
 from .utils import admin_only
 
 
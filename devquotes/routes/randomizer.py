@@ -0,0 +1,211 @@
+"""This module contains the in-process indexes used for picking random quotes."""
+
+import random
+import sys
+import time
+from array import array
+from threading import RLock
+
+from flask import current_app
+from sqlalchemy import event
+
+from devquotes.models import db
+from devquotes.models.quote import Quote
+from devquotes.models.quote_status import quote_statuses
+
+from .cache import LRUCache
+
+
+class PublishedQuoteIds:
+    """A versioned array of the published quote ids, for picking
+    a random quote in constant time.
+
+    The array is updated incrementally by the quote write paths of this
+    process and is reloaded from the database once it gets older than
+    `RANDOM_QUOTE_IDS_MAX_AGE` seconds, or when invalidated, to pick up
+    the changes made by other processes.
+    """
+
+    def __init__(self, timer=time.monotonic):
+        self.timer = timer
+        self.version = 0
+        self.status_id = None
+
+        self._ids = []
+        self._positions = {}
+        self._loaded_at = None
+        self._lock = RLock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    @property
+    def is_loaded(self):
+        """Returns `True` if the ids are loaded from the database."""
+
+        return self._loaded_at is not None
+
+    def choice(self):
+        """Returns a random published quote id, or `None` if there's none."""
+
+        with self._lock:
+            if self._is_stale():
+                self.load()
+
+            if not self._ids:
+                return None
+
+            return random.choice(self._ids)
+
+    def load(self):
+        """Loads the published quote ids from the database."""
+
+        status_name = current_app.config['PUBLISHED_STATUS_NAME']
+        status_id = quote_statuses.get_id(status_name)
+
+        rows = (
+            db.session
+            .query(Quote.id)
+            .filter(Quote.status_id == status_id)
+            .all()
+        )
+
+        with self._lock:
+            self.status_id = status_id
+            self._ids = [quote_id for quote_id, in rows]
+            self._positions = {quote_id: i for i, quote_id in enumerate(self._ids)}
+            self._loaded_at = self.timer()
+            self.version += 1
+
+    def snapshot(self):
+        """Returns a copy of the published quote ids."""
+
+        with self._lock:
+            if self._is_stale():
+                self.load()
+
+            return array('q', self._ids)
+
+    def invalidate(self):
+        """Marks the ids to be reloaded on their next use."""
+
+        with self._lock:
+            self._loaded_at = None
+
+    def add(self, quote_id):
+        """Adds the given quote id, does nothing if it already exists."""
+
+        with self._lock:
+            if quote_id in self._positions:
+                return
+
+            self._positions[quote_id] = len(self._ids)
+            self._ids.append(quote_id)
+            self.version += 1
+
+    def discard(self, quote_id):
+        """Removes the given quote id, does nothing if it doesn't exist."""
+
+        with self._lock:
+            position = self._positions.pop(quote_id, None)
+            if position is None:
+                return
+
+            # move the last id into the removed id's slot so the
+            # removal doesn't shift the array
+            last_id = self._ids.pop()
+            if last_id != quote_id:
+                self._ids[position] = last_id
+                self._positions[last_id] = position
+
+            self.version += 1
+
+    def _is_stale(self):
+        """Returns `True` if the ids should be reloaded."""
+
+        if self._loaded_at is None:
+            return True
+
+        max_age = current_app.config.get('RANDOM_QUOTE_IDS_MAX_AGE', 300)
+        return self.timer() - self._loaded_at > max_age
+
+
+class QuoteDecks:
+    """The shuffled decks of published quote ids, one for each user or
+    anonymous session, for drawing random quotes without repeating
+    them until the deck runs out.
+
+    The decks are kept in a LRU cache bounded by the memory used by
+    the ids, `RANDOM_QUOTE_DECKS_MAX_SIZE` bytes.
+    """
+
+    def __init__(self, quote_ids):
+        self.quote_ids = quote_ids
+
+        self._decks = LRUCache(getsizeof=sys.getsizeof)
+        self._lock = RLock()
+
+    def __len__(self):
+        return len(self._decks)
+
+    @property
+    def currsize(self):
+        """Returns the total bytes used by the decks."""
+
+        return self._decks.currsize
+
+    def draw(self, key):
+        """Returns the next quote id from the deck of the given `key`,
+        the deck is reshuffled when it runs out.
+
+        Args:
+            key (string): The key of the user's or session's deck.
+
+        Returns:
+            int: The quote id, or `None` if there's no published quote.
+        """
+
+        max_size = current_app.config.get('RANDOM_QUOTE_DECKS_MAX_SIZE', 16 * 1024 * 1024)
+
+        with self._lock:
+            self._decks.maxsize = max_size
+
+            deck = self._decks.pop(key)
+            if not deck:
+                deck = self.quote_ids.snapshot()
+                random.shuffle(deck)
+
+            if not deck:
+                return None
+
+            quote_id = deck.pop()
+            self._decks.set(key, deck)
+
+            return quote_id
+
+
+published_quote_ids = PublishedQuoteIds()
+quote_decks = QuoteDecks(published_quote_ids)
+
+
+@event.listens_for(Quote, 'after_insert')
+@event.listens_for(Quote, 'after_update')
+def sync_published_quote_ids(_, __, target):
+    """An event listener that adds or removes the quote's id
+    from the published quote ids when quote is saved."""
+
+    if not published_quote_ids.is_loaded:
+        return
+
+    if target.status_id == published_quote_ids.status_id:
+        published_quote_ids.add(target.id)
+    else:
+        published_quote_ids.discard(target.id)
+
+
+@event.listens_for(Quote, 'after_delete')
+def discard_published_quote_id(_, __, target):
+    """An event listener that removes the quote's id
+    from the published quote ids when quote is deleted."""
+
+    published_quote_ids.discard(target.id)
@@ -0,0 +1,60 @@
+"""This module contains the routing of the read-only queries to the
+read replica.
+
+The replica lags behind the primary, a client that just wrote, e.g.
+liked or submitted a quote, reads from the primary for the next
+`REPLICA_STICKINESS` seconds so it sees its own writes. The deadline
+is kept on the client's session cookie, any worker can honor it.
+"""
+
+import time
+from functools import wraps
+
+from flask import current_app, has_request_context, session
+
+from devquotes.models import db
+from devquotes.models.routing import REPLICA_BIND
+
+STICKY_UNTIL_KEY = 'primary_until'
+
+
+def read_only(func):
+    """A decorator that runs the queries of the function on the read
+    replica, unless the current client has to read its own writes."""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if _is_sticky():
+            return func(*args, **kwargs)
+
+        with db.session().reading_replica():
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def stick_to_primary():
+    """Routes the current client's reads to the primary for the next
+    `REPLICA_STICKINESS` seconds, does nothing outside of a request or
+    without a replica."""
+
+    if not has_request_context() or not _has_replica():
+        return
+
+    stickiness = current_app.config.get('REPLICA_STICKINESS', 10)
+    session[STICKY_UNTIL_KEY] = time.time() + stickiness
+
+
+def _is_sticky():
+    """A helper that checks if the current client wrote recently."""
+
+    if not has_request_context() or not _has_replica():
+        return False
+
+    return session.get(STICKY_UNTIL_KEY, 0) > time.time()
+
+
+def _has_replica():
+    """A helper that checks if the read replica is configured."""
+
+    return REPLICA_BIND in current_app.config['SQLALCHEMY_BINDS']
@@ -0,0 +1,274 @@
+"""This module contains the shared cache of the quote responses."""
+
+import socket
+import threading
+
+from flask import current_app
+from flask_restful.representations.json import output_json
+
+from .cache import LRUCache
+
+LOCAL = 'local'  # an in-process LRU cache, bounded by the bytes it holds
+SOCKET = 'socket'  # an external cache that speaks the memcached text protocol
+NONE = 'none'  # doesn't cache at all
+
+
+class LocalBackend:
+    """Caches the response bodies in this process.
+
+    Args:
+        maxsize (int): The maximum total bytes of the cached bodies.
+    """
+
+    def __init__(self, maxsize):
+        self._cache = LRUCache(maxsize=maxsize, getsizeof=len)
+
+    def get(self, key):
+        """Returns the cached body of the given key, or `None`."""
+
+        return self._cache.get(key)
+
+    def set(self, key, body, ttl):
+        """Caches the body for `ttl` seconds."""
+
+        self._cache.set(key, body, ttl=ttl)
+
+    def clear(self):
+        """Removes all the cached bodies."""
+
+        self._cache.clear()
+
+
+class SocketBackend:
+    """Caches the response bodies in an external cache, such as memcached,
+    reached through a Unix socket or a `host:port` address.
+
+    The cache being down is the same as a miss, the errors are logged
+    and the responses are served uncached.
+
+    Args:
+        address (string): The path of the Unix socket, or `host:port`.
+        timeout (float, optional): The seconds to wait on the cache.
+            Defaults to 0.5.
+    """
+
+    def __init__(self, address, timeout=0.5):
+        self.address = address
+        self.timeout = timeout
+
+        self._local = threading.local()
+
+    def get(self, key):
+        """Returns the cached body of the given key, or `None`."""
+
+        try:
+            return self._get(key)
+        except OSError:
+            current_app.logger.exception('Failed to read the response cache.')
+            self._disconnect()
+            return None
+
+    def set(self, key, body, ttl):
+        """Caches the body for `ttl` seconds."""
+
+        try:
+            self._command(b'set %s 0 %d %d\r\n%s\r\n' % (key.encode(), ttl, len(body), body))
+            self._read_line()
+        except OSError:
+            current_app.logger.exception('Failed to write the response cache.')
+            self._disconnect()
+
+    def clear(self):
+        """Does nothing, the cache is shared with the other workers and
+        maybe other apps, the stale bodies expire with their TTL."""
+
+    def _get(self, key):
+        """Sends a `get` and reads its value, if any."""
+
+        self._command(b'get %s\r\n' % key.encode())
+
+        body = None
+        line = self._read_line()
+        if line.startswith(b'VALUE '):
+            size = int(line.split()[3])
+            body = self._read_exactly(size + 2)[:-2]
+            line = self._read_line()
+
+        if line != b'END':
+            raise OSError(f'Unexpected response from the cache: {line!r}')
+
+        return body
+
+    def _command(self, data):
+        """Sends the command on this thread's connection."""
+
+        self._connect().sendall(data)
+
+    def _connect(self):
+        """Returns this thread's connection, connecting if needed."""
+
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+
+        if ':' in self.address:
+            host, port = self.address.rsplit(':', 1)
+            conn = socket.create_connection((host, int(port)), timeout=self.timeout)
+        else:
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conn.settimeout(self.timeout)
+            conn.connect(self.address)
+
+        self._local.conn = conn
+        self._local.buffer = b''
+        return conn
+
+    def _disconnect(self):
+        """Drops this thread's connection, it's reconnected on next use."""
+
+        conn = getattr(self._local, 'conn', None)
+        self._local.conn = None
+        if conn is not None:
+            conn.close()
+
+    def _read_line(self):
+        """Reads a line without its `\\r\\n`."""
+
+        while b'\r\n' not in self._local.buffer:
+            self._receive()
+
+        line, self._local.buffer = self._local.buffer.split(b'\r\n', 1)
+        return line
+
+    def _read_exactly(self, size):
+        """Reads the given total bytes."""
+
+        while len(self._local.buffer) < size:
+            self._receive()
+
+        data, self._local.buffer = self._local.buffer[:size], self._local.buffer[size:]
+        return data
+
+    def _receive(self):
+        """Reads the next chunk from the connection into the buffer."""
+
+        chunk = self._local.conn.recv(65536)
+        if not chunk:
+            raise OSError('The cache closed the connection.')
+
+        self._local.buffer += chunk
+
+
+class ResponseCache:
+    """The cache of the JSON bodies of the responses that are the same
+    for every user, e.g. the quote pages before the user's likes are
+    laid over them, the backend is picked with `RESPONSE_CACHE_BACKEND`
+    on first use.
+
+    The keys are expected to change along with the responses, e.g. the
+    ETags of the quote responses, the local cache is still cleared whenever
+    this process writes a quote to free the stale bodies early.
+    """
+
+    def __init__(self):
+        self._backend = None
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        """Returns the configured backend, or `None` if disabled."""
+
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = _create_backend(current_app.config)
+
+        return self._backend or None
+
+    def get(self, key):
+        """Returns the cached body of the given key, or `None`."""
+
+        backend = self.backend
+        return backend.get(key) if backend else None
+
+    def set(self, key, body):
+        """Caches the body for `RESPONSE_CACHE_TTL` seconds."""
+
+        backend = self.backend
+        if backend:
+            backend.set(key, body, current_app.config.get('RESPONSE_CACHE_TTL', 60))
+
+    def clear(self):
+        """Removes the bodies cached by this process, does nothing if the
+        backend isn't created yet."""
+
+        if self._backend:
+            self._backend.clear()
+
+    def reset(self):
+        """Drops the backend, it's created again from the config on next use."""
+
+        with self._lock:
+            self._backend = None
+
+
+def cache_control_headers(user_id):
+    """Returns the `Cache-Control` headers of a quote response, the
+    anonymous responses may be stored by shared caches for
+    `RESPONSE_CACHE_MAX_AGE` seconds, or revalidated with their ETag
+    if it's 0.
+
+    Args:
+        user_id (int): The current user's id, or `None` if anonymous.
+
+    Returns:
+        dict: The headers.
+    """
+
+    if user_id is not None:
+        return {'Cache-Control': 'private, no-cache'}
+
+    max_age = current_app.config.get('RESPONSE_CACHE_MAX_AGE', 0)
+    cache_control = f'public, max-age={max_age}' if max_age else 'public, no-cache'
+
+    # the logged in users have the JWT cookie, they get their own responses
+    return {'Cache-Control': cache_control, 'Vary': 'Cookie'}
+
+
+def json_response(data, headers, status=200):
+    """Returns the response of the marshalled data like the API's
+    JSON representation does, for caching its body."""
+
+    response = output_json(data, status, headers)
+    response.headers['Content-Type'] = 'application/json'
+
+    return response
+
+
+def cached_response(body, headers, status=200):
+    """Returns the response of a cached JSON body."""
+
+    return current_app.response_class(
+        body, status, headers, mimetype='application/json'
+    )
+
+
+def _create_backend(config):
+    """A helper that creates the backend named by the config, returns
+    `False` if the cache is disabled."""
+
+    name = config.get('RESPONSE_CACHE_BACKEND', LOCAL)
+
+    if name == LOCAL:
+        return LocalBackend(config.get('RESPONSE_CACHE_MAX_SIZE', 32 * 1024 * 1024))
+
+    if name == SOCKET:
+        return SocketBackend(config['RESPONSE_CACHE_SOCKET'])
+
+    if name == NONE:
+        return False
+
+    raise ValueError(f'Unknown response cache backend: {name}')
+
+
+response_cache = ResponseCache()
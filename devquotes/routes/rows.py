@@ -0,0 +1,59 @@
+"""This module contains the lightweight rows returned by the list queries."""
+
+from devquotes.models.quote import Quote
+from devquotes.models.quote_status import quote_statuses
+
+
+class QuoteRow:
+    """A read-only quote with only the columns of `quote_fields`,
+    selected without hydrating `Quote` models.
+
+    The status is looked up by id from the cached statuses instead
+    of being joined, it's marshalled like the `status` relationship.
+
+    Raises:
+        LookupError: If the status is missing even after reloading
+            the cached statuses.
+    """
+
+    # pylint: disable=too-few-public-methods,too-many-arguments,too-many-instance-attributes
+    # pylint: disable=redefined-builtin
+
+    __slots__ = (
+        'id', 'author', 'quotation', 'source', 'total_likes',
+        'status', 'slug', 'created_at', 'updated_at', 'is_liked',
+        'highlight',
+    )
+
+    def __init__(self, id, author, quotation, source, total_likes,
+                 status_id, slug, created_at, updated_at, is_liked=False,
+                 highlight=None):
+        self.id = id
+        self.author = author
+        self.quotation = quotation
+        self.source = source
+        self.total_likes = total_likes
+        self.status = quote_statuses.get(status_id)
+        if self.status is None:
+            raise LookupError(f'Unknown quote status id: {status_id}')
+        self.slug = slug
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.is_liked = is_liked
+        self.highlight = highlight
+
+    @staticmethod
+    def columns():
+        """Returns the selected columns in the order of the constructor."""
+
+        return [
+            Quote.id,
+            Quote.author,
+            Quote.quotation,
+            Quote.source,
+            Quote.total_likes,
+            Quote.status_id,
+            Quote.slug,
+            Quote.created_at,
+            Quote.updated_at,
+        ]
@@ -0,0 +1,216 @@
+"""This module contains the full-text search helpers of the quotes.
+
+The matches of a search are ranked once, their ids are cached in rank
+order so the follow-up pages are sliced from the cached ids instead of
+ranking every match again. The ranking runs in a savepoint bounded by
+`SEARCH_STATEMENT_TIMEOUT`, a slow query can't hold the connection.
+"""
+
+import html
+from contextlib import contextmanager
+
+from flask import current_app
+from sqlalchemy import literal, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.sql.expression import func
+from sqlalchemy_searchable import search_manager
+
+from devquotes.models import db
+from devquotes.models.quote import Quote
+
+from .cache import LRUCache
+
+# the markers `ts_headline` wraps the matches with, they're replaced after
+# the snippet is escaped since the quotations are not trusted HTML
+HEADLINE_START = '\x02'
+HEADLINE_STOP = '\x03'
+HEADLINE_OPTIONS = (
+    f'StartSel={HEADLINE_START}, StopSel={HEADLINE_STOP}, '
+    'MaxWords=35, MinWords=15, HighlightAll=false'
+)
+
+_ranked_ids_cache = LRUCache(maxsize=256)
+
+
+class SearchUnavailableError(Exception):
+    """Raised when the matches of a search query can't be ranked."""
+
+
+def build_tsquery(search_query):
+    """Returns the `tsquery` of the given search query, parsed by
+    `sqlalchemy_searchable`'s `tsq_parse` which matches every word as
+    a prefix, so the results follow the query as it's typed.
+
+    Args:
+        search_query (string): The query sent by the client.
+
+    Returns:
+        object: The SQL expression of the `tsquery`.
+    """
+
+    regconfig = search_manager.options['regconfig']
+    return func.tsq_parse(regconfig, search_query)
+
+
+def build_headline(document, tsquery):
+    """Returns the SQL expression of the snippet of the document with
+    the matches of the `tsquery` marked, see `format_headline`."""
+
+    regconfig = search_manager.options['regconfig']
+    return func.ts_headline(regconfig, document, tsquery, HEADLINE_OPTIONS)
+
+
+def format_headline(headline):
+    """Returns the snippet returned by `build_headline` as HTML, the
+    matches are wrapped in `<mark>` and everything else is escaped.
+
+    Args:
+        headline (string): The snippet, or `None`.
+
+    Returns:
+        string: The HTML snippet, or `None`.
+    """
+
+    if headline is None:
+        return None
+
+    return (
+        html.escape(headline)
+        .replace(HEADLINE_START, '<mark>')
+        .replace(HEADLINE_STOP, '</mark>')
+    )
+
+
+def rank_matches(search_query, tsquery, published_filter, max_results):
+    """Returns the ids of the matches of the search query, most relevant
+    first. The full-text matches are ranked first, when they're fewer than
+    `SEARCH_FUZZY_MIN_HITS` the quotes whose author or quotation are
+    similar to the query follow them, so misspelled queries still match.
+
+    Args:
+        search_query (string): The query sent by the client.
+        tsquery (object): The `tsquery` of the query, see `build_tsquery`.
+        published_filter (object): The criterion of the published quotes.
+        max_results (int): The maximum matches to return.
+
+    Raises:
+        SearchUnavailableError: This will be raised if the full-text
+            matches can't be ranked, e.g. when it times out.
+
+    Returns:
+        list: The ranked quote ids.
+    """
+
+    try:
+        with _bounded_savepoint():
+            ids = _rank_text_matches(tsquery, published_filter, max_results)
+    except DBAPIError as error:
+        current_app.logger.warning('Failed to rank the search matches.', exc_info=True)
+        raise SearchUnavailableError(search_query) from error
+
+    min_hits = current_app.config.get('SEARCH_FUZZY_MIN_HITS', 3)
+    if len(ids) < min(min_hits, max_results):
+        ids += _rank_similar_quotes_or_none(
+            search_query, published_filter, max_results - len(ids), ids
+        )
+
+    return ids
+
+
+def get_ranked_ids(search_query, rank_ids):
+    """Returns the ids of the matches of the search query, most relevant
+    first, cached for `SEARCH_RESULTS_CACHE_TTL` seconds.
+
+    Args:
+        search_query (string): The query sent by the client.
+        rank_ids (callable): Ranks the matches of the query, it takes
+            the maximum matches to return, `SEARCH_MAX_RESULTS`.
+
+    Returns:
+        tuple: The ranked quote ids.
+    """
+
+    # a trailing space ends the prefix word, the query isn't stripped
+    ids = _ranked_ids_cache.get(search_query)
+    if ids is None:
+        ids = tuple(rank_ids(current_app.config.get('SEARCH_MAX_RESULTS', 1000)))
+        ttl = current_app.config.get('SEARCH_RESULTS_CACHE_TTL', 60)
+        _ranked_ids_cache.set(search_query, ids, ttl=ttl)
+
+    return ids
+
+
+def clear_ranked_ids():
+    """Removes the cached rankings, e.g. after the quotes change."""
+
+    _ranked_ids_cache.clear()
+
+
+def _rank_text_matches(tsquery, published_filter, max_results):
+    """A helper that returns the ids of the full-text matches of the
+    `tsquery`, most relevant first."""
+
+    rank = func.ts_rank_cd(Quote.search_vector, tsquery)
+    query = (
+        db.session.query(Quote.id)
+        .filter(published_filter)
+        .filter(Quote.search_vector.op('@@')(tsquery))
+        .order_by(rank.desc(), Quote.id.desc())
+        .limit(max_results)
+    )
+
+    return [quote_id for quote_id, in query]
+
+
+def _rank_similar_quotes(search_query, published_filter, max_results, exclude_ids):
+    """A helper that returns the ids of the quotes whose author or a part
+    of their quotation is similar to the query, most similar first, it
+    requires `pg_trgm` and is served by its trigram indexes."""
+
+    author_similarity = func.word_similarity(search_query, Quote.author)
+    quotation_similarity = func.word_similarity(search_query, Quote.quotation)
+
+    query = (
+        db.session.query(Quote.id)
+        .filter(published_filter)
+        .filter(
+            literal(search_query).op('<%')(Quote.author)
+            | literal(search_query).op('<%')(Quote.quotation)
+        )
+        .filter(~Quote.id.in_(exclude_ids) if exclude_ids else literal(True))
+        .order_by(func.greatest(author_similarity, quotation_similarity).desc(), Quote.id.desc())
+        .limit(max_results)
+    )
+
+    return [quote_id for quote_id, in query]
+
+
+def _rank_similar_quotes_or_none(*args):
+    """A helper that runs `_rank_similar_quotes` in a savepoint, the fuzzy
+    matches are skipped if it fails, e.g. when it times out."""
+
+    try:
+        with _bounded_savepoint():
+            return _rank_similar_quotes(*args)
+    except DBAPIError:
+        current_app.logger.warning('Skipped the fuzzy search.', exc_info=True)
+        return []
+
+
+@contextmanager
+def _bounded_savepoint():
+    """A helper that runs the block in a savepoint whose statements are
+    canceled after `SEARCH_STATEMENT_TIMEOUT` milliseconds, a failed
+    block is rolled back to the savepoint, along with the timeout, so
+    the transaction can go on."""
+
+    milliseconds = current_app.config.get('SEARCH_STATEMENT_TIMEOUT', 500)
+
+    with db.session.begin_nested():
+        db.session.execute(
+            select([func.set_config('statement_timeout', f'{int(milliseconds)}ms', True)])
+        )
+
+        yield
+
+        db.session.execute('SET LOCAL statement_timeout TO DEFAULT')
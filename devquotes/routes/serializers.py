@@ -0,0 +1,253 @@
+"""This module contains the compiled counterparts of `flask_restful.marshal`
+and `flask_restful.marshal_with`.
+
+A fields spec is compiled once into a function that marshals an object
+without walking the spec, splitting the attribute names or dispatching
+to the field instances for every value, the output is the same as
+`flask_restful.marshal` for the same spec.
+"""
+
+from collections import OrderedDict
+from functools import wraps
+
+from flask_restful import fields, unpack
+from werkzeug.wrappers import BaseResponse
+
+# the field types whose `format` can be replaced with a builtin,
+# `None` means the value is output as it is
+_FORMATTERS = {
+    fields.Raw: None,
+    fields.String: str,
+    fields.Integer: int,
+    fields.Boolean: bool,
+    fields.Float: float,
+}
+
+# whether the instances of a type are read by key or by attribute
+_indexable_types = {}
+
+# the compiled specs by their id, the specs are kept alongside
+# so their ids can't be reused
+_compiled_specs = {}
+
+
+class marshal_with:
+    """A drop-in replacement of `flask_restful.marshal_with` that
+    marshals the return values with the compiled `fields`, responses
+    such as a 304 are returned as they are.
+
+    Args:
+        fields (dict): The fields spec.
+        envelope (string, optional): The key to envelop the output with.
+            Defaults to None.
+    """
+
+    # pylint: disable=invalid-name,too-few-public-methods,redefined-outer-name
+
+    def __init__(self, fields, envelope=None):
+        self.serialize = compile_fields(fields)
+        self.envelope = envelope
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            resp = func(*args, **kwargs)
+            if isinstance(resp, BaseResponse):
+                return resp
+
+            if isinstance(resp, tuple):
+                data, code, headers = unpack(resp)
+                return _envelop(self.serialize(data), self.envelope), code, headers
+
+            return _envelop(self.serialize(resp), self.envelope)
+
+        return wrapper
+
+
+def marshal(data, spec, envelope=None):
+    """A drop-in replacement of `flask_restful.marshal` that compiles
+    the `spec` on its first use.
+
+    Args:
+        data (object): The object, or list of objects, to marshal.
+        spec (dict): The fields spec.
+        envelope (string, optional): The key to envelop the output with.
+            Defaults to None.
+
+    Returns:
+        object: The marshalled `OrderedDict`, or list of them.
+    """
+
+    compiled = _compiled_specs.get(id(spec))
+    if compiled is None:
+        compiled = _compiled_specs[id(spec)] = (spec, compile_fields(spec))
+
+    return _envelop(compiled[1](data), envelope)
+
+
+def compile_fields(spec):
+    """Compiles the fields spec into a function that marshals an object,
+    or a list of objects, like `flask_restful.marshal` does.
+
+    Args:
+        spec (dict): The fields spec.
+
+    Returns:
+        callable: The function that takes the object to marshal.
+    """
+
+    keys = list(spec)
+    outputs = [_compile_field(key, field) for key, field in spec.items()]
+
+    def serialize(obj):
+        if isinstance(obj, (list, tuple)):
+            return [serialize(item) for item in obj]
+
+        return OrderedDict(zip(keys, [output(obj) for output in outputs]))
+
+    return serialize
+
+
+def _envelop(data, envelope):
+    """A helper that wraps the data in the envelope, if any."""
+
+    return OrderedDict([(envelope, data)]) if envelope else data
+
+
+def _compile_field(key, field):
+    """A helper that compiles a field of the spec into a function
+    that outputs its value from an object."""
+
+    if isinstance(field, dict):
+        return compile_fields(field)
+
+    if isinstance(field, type):
+        field = field()
+
+    field_type = type(field)
+
+    if field_type is fields.Nested:
+        get_value = _compile_getter(key if field.attribute is None else field.attribute)
+        output_nested = _compile_nested(field)
+        return lambda obj: output_nested(get_value(obj))
+
+    if field_type is fields.List and isinstance(field.container, fields.Nested):
+        return _compile_nested_list(key, field)
+
+    if field_type is fields.DateTime and field.dt_format == 'iso8601':
+        return _compile_formatted(key, field, lambda value: value.isoformat())
+
+    if field_type in _FORMATTERS:
+        return _compile_formatted(key, field, _FORMATTERS[field_type])
+
+    # the custom fields are output as they are
+    return lambda obj: field.output(key, obj)
+
+
+def _compile_formatted(key, field, formatter):
+    """A helper that compiles a field whose value is only formatted."""
+
+    get_value = _compile_getter(key if field.attribute is None else field.attribute)
+    default = field.default
+
+    if formatter is None:
+        def output(obj):
+            value = get_value(obj)
+            return default if value is None else value
+    else:
+        def output(obj):
+            value = get_value(obj)
+            return default if value is None else formatter(value)
+
+    return output
+
+
+def _compile_nested(field):
+    """A helper that compiles the output of `fields.Nested`
+    for its already retrieved value."""
+
+    serialize = compile_fields(field.nested)
+    allow_null = field.allow_null
+    default = field.default
+
+    def output(value):
+        if value is None:
+            if allow_null:
+                return None
+            if default is not None:
+                return default
+
+        return serialize(value)
+
+    return output
+
+
+def _compile_nested_list(key, field):
+    """A helper that compiles `fields.List` of `fields.Nested`."""
+
+    get_value = _compile_getter(key if field.attribute is None else field.attribute)
+    output_item = _compile_nested(field.container)
+    serialize = compile_fields(field.container.nested)
+    default = field.default
+
+    def output(obj):
+        value = get_value(obj)
+        if _is_indexable(value) and not isinstance(value, dict):
+            return [output_item(item) for item in value]
+
+        if value is None:
+            return default
+
+        return [serialize(value)]
+
+    return output
+
+
+def _compile_getter(key):
+    """A helper that compiles `flask_restful.fields.get_value` for the
+    given key, a dotted key reads the nested attributes."""
+
+    if callable(key):
+        return key
+
+    if isinstance(key, int):
+        return lambda obj: fields.get_value(key, obj)
+
+    names = key.split('.')
+    if len(names) > 1:
+        getters = [_compile_getter(name) for name in names]
+
+        def get_nested_value(obj):
+            for get_value in getters:
+                obj = get_value(obj)
+            return obj
+
+        return get_nested_value
+
+    def get_value(obj):
+        indexable = _indexable_types.get(type(obj))
+        if indexable is None:
+            indexable = _is_indexable(obj)
+
+        if indexable:
+            try:
+                return obj[key]
+            except (IndexError, TypeError, KeyError):
+                pass
+
+        return getattr(obj, key, None)
+
+    return get_value
+
+
+def _is_indexable(obj):
+    """A helper that caches `flask_restful.fields.is_indexable_but_not_string`
+    by the object's type."""
+
+    obj_type = type(obj)
+
+    indexable = _indexable_types.get(obj_type)
+    if indexable is None:
+        indexable = _indexable_types[obj_type] = fields.is_indexable_but_not_string(obj)
+
+    return indexable
@@ -0,0 +1,212 @@
+"""This module contains the upkeep of the users' stats, they're updated
+along with the likes and the quotes and can be rebuilt from the like and
+quote tables if they drift."""
+
+from collections import Counter
+
+from flask import current_app
+from sqlalchemy import event, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm.attributes import get_history
+from sqlalchemy.sql.expression import func
+
+from devquotes.models import db
+from devquotes.models.like import Like
+from devquotes.models.quote import Quote
+from devquotes.models.quote_status import quote_statuses
+from devquotes.models.user import User
+from devquotes.models.user_stats import UserStats
+
+
+def recompute_user_stats():
+    """Rebuilds every user's stats from the like and quote tables
+    in a single statement.
+
+    Returns:
+        int: The total users whose stats are rebuilt.
+    """
+
+    stats_table = UserStats.__table__
+    actual_stats = _select_actual_user_stats()
+
+    stmt = insert(stats_table).from_select(
+        ['user_id', 'total_likes', 'total_submitted'], actual_stats
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[stats_table.c.user_id],
+        set_={
+            'total_likes': stmt.excluded.total_likes,
+            'total_submitted': stmt.excluded.total_submitted,
+        },
+    )
+
+    result = db.session.execute(stmt)
+    db.session.commit()
+
+    return result.rowcount
+
+
+def get_user_stats_drift():
+    """Returns the users whose stored stats don't match the like
+    and quote tables.
+
+    Returns:
+        list: The rows of `user_id`, the stored and the actual
+            `total_likes` and `total_submitted`.
+    """
+
+    stats_table = UserStats.__table__
+    actual = _select_actual_user_stats().alias('actual')
+
+    stored_likes = func.coalesce(stats_table.c.total_likes, 0)
+    stored_submitted = func.coalesce(stats_table.c.total_submitted, 0)
+
+    query = (
+        select([
+            actual.c.user_id,
+            stored_likes.label('stored_total_likes'),
+            actual.c.total_likes.label('actual_total_likes'),
+            stored_submitted.label('stored_total_submitted'),
+            actual.c.total_submitted.label('actual_total_submitted'),
+        ])
+        .select_from(actual.outerjoin(stats_table, stats_table.c.user_id == actual.c.user_id))
+        .where(
+            (stored_likes != actual.c.total_likes) |
+            (stored_submitted != actual.c.total_submitted)
+        )
+        .order_by(actual.c.user_id)
+    )
+
+    return db.session.execute(query).fetchall()
+
+
+def update_user_stats(executor, deltas):
+    """Adds the given deltas to the users' stats, creating the stats
+    of the users that have none.
+
+    Args:
+        executor (object): The session or connection to execute on.
+        deltas (object): The `user_id`, `total_likes` and `total_submitted`
+            deltas, either as a list of dicts or as a select.
+    """
+
+    stats_table = UserStats.__table__
+    columns = ['user_id', 'total_likes', 'total_submitted']
+
+    stmt = insert(stats_table)
+    if isinstance(deltas, list):
+        stmt = stmt.values(deltas)
+    else:
+        stmt = stmt.from_select(columns, deltas)
+
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[stats_table.c.user_id],
+        set_={
+            'total_likes': stats_table.c.total_likes + stmt.excluded.total_likes,
+            'total_submitted': stats_table.c.total_submitted + stmt.excluded.total_submitted,
+            'likes_version': stats_table.c.likes_version + 1,
+        },
+    )
+
+    executor.execute(stmt)
+
+
+def select_likers_stats(criterion):
+    """Returns the select of the `total_likes` deltas for the users who
+    liked the quotes matching `criterion`, when those likes are about
+    to be deleted, see `update_user_stats`."""
+
+    return (
+        select([Like.user_id, -func.count(), literal(0)])
+        .where(criterion)
+        .group_by(Like.user_id)
+    )
+
+
+def _select_actual_user_stats():
+    """A helper that returns the select of every user's stats counted
+    from the like and quote tables."""
+
+    likes = (
+        select([Like.user_id, func.count().label('total')])
+        .group_by(Like.user_id)
+        .alias('likes')
+    )
+    submitted = (
+        select([Quote.contributor_id.label('user_id'), func.count().label('total')])
+        .where(Quote.status_id == _get_published_status_id())
+        .group_by(Quote.contributor_id)
+        .alias('submitted')
+    )
+
+    user_table = User.__table__
+    return (
+        select([
+            user_table.c.id.label('user_id'),
+            func.coalesce(likes.c.total, 0).label('total_likes'),
+            func.coalesce(submitted.c.total, 0).label('total_submitted'),
+        ])
+        .select_from(
+            user_table
+            .outerjoin(likes, likes.c.user_id == user_table.c.id)
+            .outerjoin(submitted, submitted.c.user_id == user_table.c.id)
+        )
+    )
+
+
+def _get_published_status_id():
+    """Returns the id of the published quote status."""
+
+    return quote_statuses.get_id(current_app.config['PUBLISHED_STATUS_NAME'])
+
+
+@event.listens_for(Quote, 'after_insert')
+def increment_user_submitted(_, connection, target):
+    """An event listener that increments the contributor's
+    `total_submitted` when a published quote is created."""
+
+    if target.status_id == _get_published_status_id():
+        update_user_stats(connection, [
+            {'user_id': target.contributor_id, 'total_likes': 0, 'total_submitted': 1}
+        ])
+
+
+@event.listens_for(Quote, 'after_update')
+def update_user_submitted(_, connection, target):
+    """An event listener that moves the `total_submitted` between
+    contributors when quote enters or leaves the published status."""
+
+    status_history = get_history(target, 'status_id')
+    contributor_history = get_history(target, 'contributor_id')
+    if not status_history.has_changes() and not contributor_history.has_changes():
+        return
+
+    old_status_id = (status_history.deleted or status_history.unchanged)[0]
+    old_contributor_id = (contributor_history.deleted or contributor_history.unchanged)[0]
+    published_status_id = _get_published_status_id()
+
+    submitted = Counter()
+    if old_status_id == published_status_id:
+        submitted[old_contributor_id] -= 1
+    if target.status_id == published_status_id:
+        submitted[target.contributor_id] += 1
+
+    deltas = [
+        {'user_id': user_id, 'total_likes': 0, 'total_submitted': total}
+        for user_id, total in submitted.items() if total
+    ]
+    if deltas:
+        update_user_stats(connection, deltas)
+
+
+@event.listens_for(Quote, 'before_delete')
+def decrement_user_stats(_, connection, target):
+    """An event listener that decrements the contributor's `total_submitted`
+    and the likers' `total_likes` before quote and its likes are deleted."""
+
+    update_user_stats(connection, select_likers_stats(Like.quote_id == target.id))
+
+    if target.status_id == _get_published_status_id():
+        update_user_stats(connection, [
+            {'user_id': target.contributor_id, 'total_likes': 0, 'total_submitted': -1}
+        ])
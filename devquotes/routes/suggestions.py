@@ -0,0 +1,364 @@
+"""This module contains the in-process prefix index used for suggesting
+authors and quotations as the user types."""
+
+import re
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+from threading import RLock
+
+from flask import current_app
+from sqlalchemy import event
+
+from devquotes.models import db
+from devquotes.models.quote import Quote
+from devquotes.models.quote_status import quote_statuses
+
+# the quotations are indexed by the words following each of their words,
+# longer queries are matched by their first words and then checked
+NGRAM_WORDS = 3
+
+_word_re = re.compile(r'\w+')
+
+
+class PrefixIndex:
+    """A sorted array of `(key, value)` entries, the values whose keys
+    start with a prefix are found with a binary search."""
+
+    def __init__(self, entries=()):
+        # sorted once, inserting the entries one by one is quadratic
+        self._entries = sorted(entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, keys, value):
+        """Adds the value under each of the given keys, for updating the
+        index incrementally."""
+
+        for key in keys:
+            insort(self._entries, (key, value))
+
+    def discard(self, keys, value):
+        """Removes the value from each of the given keys."""
+
+        for key in keys:
+            position = bisect_left(self._entries, (key, value))
+            if position < len(self._entries) and self._entries[position] == (key, value):
+                del self._entries[position]
+
+    def find(self, prefix, limit, accept=None):
+        """Returns the distinct values whose keys start with the prefix,
+        in the order of their keys.
+
+        Args:
+            prefix (string): The prefix of the keys.
+            limit (int): The maximum values to return.
+            accept (callable, optional): Filters the found values.
+                Defaults to None.
+
+        Returns:
+            list: The values.
+        """
+
+        values = []
+        seen = set()
+
+        entries = self._entries
+        for position in range(bisect_left(entries, (prefix,)), len(entries)):
+            key, value = entries[position]
+            if len(values) >= limit or not key.startswith(prefix):
+                break
+
+            if value in seen or (accept and not accept(value)):
+                continue
+
+            seen.add(value)
+            values.append(value)
+
+        return values
+
+    def clear(self):
+        """Removes all the entries."""
+
+        self._entries = []
+
+
+class QuoteSuggestions:
+    """The published quotes' authors and quotations indexed by the
+    prefixes of their words, for suggesting them without a query.
+
+    The index is updated incrementally by the quote write paths of this
+    process and is rebuilt from the database once it gets older than
+    `SUGGESTIONS_MAX_AGE` seconds, or when invalidated, to pick up the
+    changes made by other processes.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, timer=time.monotonic):
+        self.timer = timer
+        self.status_id = None
+
+        self._authors = PrefixIndex()
+        self._author_names = {}
+        self._author_counts = Counter()
+        self._quotations = PrefixIndex()
+        self._quotes = {}
+        self._loaded_at = None
+        self._is_loading = False
+        self._lock = RLock()
+
+    def __len__(self):
+        return len(self._quotes)
+
+    @property
+    def is_loaded(self):
+        """Returns `True` if the index is loaded from the database."""
+
+        return self._loaded_at is not None
+
+    def suggest(self, query, limit=10):
+        """Returns the authors and the quotes matching the query, each of
+        its words matches the start of a word and the last one may be
+        partially typed.
+
+        Args:
+            query (string): The text typed by the user.
+            limit (int, optional): The maximum authors, and the maximum
+                quotes, to return. Defaults to 10.
+
+        Returns:
+            dict: The `authors` names and the `quotes` as dicts of
+                their `id`, `author` and `quotation`.
+        """
+
+        words = _get_words(query)
+        if not words:
+            return {'authors': [], 'quotes': []}
+
+        prefix = ' '.join(words)
+
+        accept = None
+        if len(words) > NGRAM_WORDS:
+            # the n-grams only cover the query's first words
+            def has_query(quote_id):
+                return f' {prefix}' in self._quotes[quote_id][2]
+
+            accept = has_query
+
+        if self._is_stale():
+            self.load()
+
+        with self._lock:
+            author_keys = self._authors.find(prefix, limit)
+            quote_ids = self._quotations.find(
+                ' '.join(words[:NGRAM_WORDS]), limit, accept
+            )
+
+            return {
+                'authors': [self._author_names[key] for key in author_keys],
+                'quotes': [self._get_quote(quote_id) for quote_id in quote_ids],
+            }
+
+    def load(self):
+        """Builds the index from the published quotes in the database,
+        the suggestions are served from the previous index meanwhile."""
+
+        with self._lock:
+            if self._is_loading and self.is_loaded:
+                return
+            self._is_loading = True
+
+        try:
+            status_name = current_app.config['PUBLISHED_STATUS_NAME']
+            status_id = quote_statuses.get_id(status_name)
+
+            rows = (
+                db.session
+                .query(Quote.id, Quote.author, Quote.quotation)
+                .filter(Quote.status_id == status_id)
+                .all()
+            )
+
+            self.replace(rows, status_id)
+        finally:
+            with self._lock:
+                self._is_loading = False
+
+    def replace(self, rows, status_id=None):
+        """Replaces the index with one of the given quotes, it's built
+        without holding the lock so the suggestions aren't blocked.
+
+        Args:
+            rows (list): The `(id, author, quotation)` of the quotes.
+            status_id (int, optional): The status of the quotes.
+                Defaults to None.
+        """
+
+        index = _build_index(rows)
+
+        with self._lock:
+            self.status_id = status_id
+            (
+                self._authors,
+                self._author_names,
+                self._author_counts,
+                self._quotations,
+                self._quotes,
+            ) = index
+            self._loaded_at = self.timer()
+
+    def invalidate(self):
+        """Marks the index to be rebuilt on its next use."""
+
+        with self._lock:
+            self._loaded_at = None
+
+    def add(self, quote_id, author, quotation):
+        """Indexes the given quote, replacing its previous author and
+        quotation if it's already indexed."""
+
+        with self._lock:
+            self._discard(quote_id)
+            self._add(quote_id, author, quotation)
+
+    def discard(self, quote_id):
+        """Removes the given quote, does nothing if it's not indexed."""
+
+        with self._lock:
+            self._discard(quote_id)
+
+    def _add(self, quote_id, author, quotation):
+        """Indexes the quote, the caller must hold the lock."""
+
+        author_key = ' '.join(_get_words(author))
+        quotation_words = _get_words(quotation)
+
+        # the quotation's words are kept for checking the long queries
+        self._quotes[quote_id] = (author, quotation, ' ' + ' '.join(quotation_words))
+        self._quotations.add(_get_ngrams(quotation_words), quote_id)
+
+        self._author_counts[author_key] += 1
+        if self._author_counts[author_key] == 1:
+            self._author_names[author_key] = author
+            self._authors.add(_get_ngrams(author_key.split(), None), author_key)
+
+    def _discard(self, quote_id):
+        """Removes the quote, the caller must hold the lock."""
+
+        quote = self._quotes.pop(quote_id, None)
+        if quote is None:
+            return
+
+        author, _, quotation_key = quote
+        self._quotations.discard(_get_ngrams(quotation_key.split()), quote_id)
+
+        author_key = ' '.join(_get_words(author))
+        self._author_counts[author_key] -= 1
+        if self._author_counts[author_key] <= 0:
+            del self._author_counts[author_key]
+            del self._author_names[author_key]
+            self._authors.discard(_get_ngrams(author_key.split(), None), author_key)
+
+    def _get_quote(self, quote_id):
+        """Returns the indexed quote as a dict."""
+
+        author, quotation, _ = self._quotes[quote_id]
+        return {'id': quote_id, 'author': author, 'quotation': quotation}
+
+    def _is_stale(self):
+        """Returns `True` if the index should be rebuilt."""
+
+        if self._loaded_at is None:
+            return True
+
+        max_age = current_app.config.get('SUGGESTIONS_MAX_AGE', 300)
+        return self.timer() - self._loaded_at > max_age
+
+
+def _build_index(rows):
+    """A helper that builds the index of the given `(id, author, quotation)`
+    rows, returns the authors' `PrefixIndex`, their names and counts by
+    key, the quotations' `PrefixIndex` and the quotes by id."""
+
+    author_entries = []
+    author_names = {}
+    author_counts = Counter()
+    quotation_entries = []
+    quotes = {}
+
+    for quote_id, author, quotation in rows:
+        author_key = ' '.join(_get_words(author))
+        quotation_words = _get_words(quotation)
+
+        quotes[quote_id] = (author, quotation, ' ' + ' '.join(quotation_words))
+        quotation_entries.extend((key, quote_id) for key in _get_ngrams(quotation_words))
+
+        author_counts[author_key] += 1
+        if author_counts[author_key] == 1:
+            author_names[author_key] = author
+            author_entries.extend(
+                (key, author_key) for key in _get_ngrams(author_key.split(), None)
+            )
+
+    return (
+        PrefixIndex(author_entries),
+        author_names,
+        author_counts,
+        PrefixIndex(quotation_entries),
+        quotes,
+    )
+
+
+def _get_words(text):
+    """A helper that returns the case-folded words of the text."""
+
+    return _word_re.findall(text.casefold())
+
+
+def _get_ngrams(words, size=NGRAM_WORDS):
+    """A helper that returns the distinct runs of words starting at each
+    word, at most `size` words long or up to the last word if `None`."""
+
+    return {
+        ' '.join(words[i:i + size] if size else words[i:])
+        for i in range(len(words))
+    }
+
+
+quote_suggestions = QuoteSuggestions()
+
+
+@event.listens_for(Quote, 'after_insert')
+@event.listens_for(Quote, 'after_update')
+def sync_quote_suggestions(_, __, target):
+    """An event listener that indexes the quote's author and quotation
+    for suggestions, or removes them, when quote is saved."""
+
+    if not quote_suggestions.is_loaded:
+        return
+
+    if target.status_id == quote_suggestions.status_id:
+        quote_suggestions.add(target.id, target.author, target.quotation)
+    else:
+        quote_suggestions.discard(target.id)
+
+
+@event.listens_for(Quote, 'after_delete')
+def discard_quote_suggestions(_, __, target):
+    """An event listener that removes the quote's author and quotation
+    from suggestions when quote is deleted."""
+
+    quote_suggestions.discard(target.id)
+
+
+@event.listens_for(db.session, 'after_bulk_update')
+@event.listens_for(db.session, 'after_bulk_delete')
+def invalidate_quote_suggestions(context):
+    """An event listener that rebuilds the suggestions on their next use
+    when quotes are updated or deleted with `Query.update` or
+    `Query.delete`, the changed quotes are not known."""
+
+    if context.mapper.class_ is Quote:
+        quote_suggestions.invalidate()
@@ -0,0 +1,265 @@
+"""This module contains the cached verification of Firebase ID tokens."""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from threading import RLock
+
+import firebase_admin
+import google.auth.exceptions
+import requests
+from firebase_admin.auth import (
+    CertificateFetchError,
+    ExpiredIdTokenError,
+    InvalidIdTokenError,
+)
+from flask import current_app
+from google.auth import jwt
+
+from .cache import LRUCache
+
+ID_TOKEN_CERT_URL = (
+    'https://www.googleapis.com/robot/v1/metadata/x509/'
+    'securetoken@system.gserviceaccount.com'
+)
+ID_TOKEN_ISSUER_PREFIX = 'https://securetoken.google.com/'
+
+# used when the certificates response has no `Cache-Control: max-age`
+DEFAULT_CERTS_MAX_AGE = 3600  # seconds
+
+# a forced refresh this soon after the last fetch is skipped, so tokens
+# with made-up key ids can't make every login fetch the certificates
+MIN_CERTS_REFRESH_INTERVAL = 60  # seconds
+
+_max_age_re = re.compile(r'max-age=(\d+)')
+
+
+class PublicKeyCache:
+    """Google's public certificates for verifying ID tokens, cached until
+    the `max-age` of their response passes and then fetched again.
+
+    When `FIREBASE_PUBLIC_KEYS_CACHE` is set, the certificates are also
+    stored in that file so the workers share a single fetch. When testing
+    with `FIREBASE_PUBLIC_KEYS_FILE` set, the certificates are read from
+    that local key set instead, for verifying tokens offline.
+    """
+
+    def __init__(self, timer=time.time):
+        self.timer = timer
+
+        self._certs = None
+        self._expires_at = None
+        self._fetched_at = None
+        self._lock = RLock()
+
+    def get(self, refresh=False):
+        """Returns the certificates by key id.
+
+        Args:
+            refresh (bool, optional): Fetches the certificates even if they
+                haven't expired, for picking up rotated keys, unless they were
+                fetched in the last `MIN_CERTS_REFRESH_INTERVAL` seconds.
+                Defaults to False.
+
+        Returns:
+            dict: The PEM encoded certificates by key id.
+        """
+
+        local_path = current_app.config.get('FIREBASE_PUBLIC_KEYS_FILE')
+        if local_path and current_app.testing:
+            with open(local_path) as in_file:
+                return json.load(in_file)
+
+        shared_path = current_app.config.get('FIREBASE_PUBLIC_KEYS_CACHE')
+
+        with self._lock:
+            if refresh and self._is_fetched_recently():
+                return self._certs
+
+            if not refresh and self._is_fresh():
+                return self._certs
+
+            if not refresh and shared_path:
+                self._read_shared(shared_path)
+                if self._is_fresh():
+                    return self._certs
+
+            certs, max_age = self._fetch()
+            self._certs = certs
+            self._fetched_at = self.timer()
+            self._expires_at = self._fetched_at + max_age
+
+            if shared_path:
+                self._write_shared(shared_path)
+
+            return self._certs
+
+    def invalidate(self):
+        """Marks the certificates to be fetched on their next use."""
+
+        with self._lock:
+            self._expires_at = None
+
+    def _is_fresh(self):
+        """Returns `True` if the certificates haven't expired."""
+
+        return self._expires_at is not None and self.timer() < self._expires_at
+
+    def _is_fetched_recently(self):
+        """Returns `True` if this process fetched the certificates
+        in the last `MIN_CERTS_REFRESH_INTERVAL` seconds."""
+
+        return (
+            self._fetched_at is not None
+            and self.timer() - self._fetched_at < MIN_CERTS_REFRESH_INTERVAL
+        )
+
+    def _read_shared(self, path):
+        """Loads the certificates stored by another worker, ignoring
+        the file if it's missing or malformed."""
+
+        try:
+            with open(path) as in_file:
+                data = json.load(in_file)
+            certs, expires_at = data['certs'], float(data['expires_at'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+
+        self._certs = certs
+        self._expires_at = expires_at
+
+    def _write_shared(self, path):
+        """Stores the certificates for the other workers, the file is
+        replaced atomically so readers never see a partial write."""
+
+        directory = os.path.dirname(os.path.abspath(path))
+        file_descriptor, temp_path = tempfile.mkstemp(dir=directory)
+
+        try:
+            with os.fdopen(file_descriptor, 'w') as out_file:
+                json.dump({'certs': self._certs, 'expires_at': self._expires_at}, out_file)
+            os.replace(temp_path, path)
+        except OSError:
+            current_app.logger.exception('Failed to share the public keys.')
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    @staticmethod
+    def _fetch():
+        """Fetches the certificates and their `max-age` from Google."""
+
+        try:
+            response = requests.get(ID_TOKEN_CERT_URL, timeout=10)
+            response.raise_for_status()
+        except requests.RequestException as error:
+            raise CertificateFetchError(str(error), cause=error) from error
+
+        match = _max_age_re.search(response.headers.get('Cache-Control', ''))
+        max_age = int(match.group(1)) if match else DEFAULT_CERTS_MAX_AGE
+
+        return response.json(), max_age
+
+
+class IdTokenVerifier:
+    """Verifies Firebase ID tokens like `firebase_admin.auth.verify_id_token`
+    does, the claims of the verified tokens are cached by the token's digest
+    for `ID_TOKEN_CACHE_TTL` seconds and never past the token's expiry.
+
+    Args:
+        key_cache (object): The `PublicKeyCache` to verify the signatures with.
+        maxsize (int, optional): The maximum cached tokens. Defaults to 4096.
+        timer (callable, optional): The wall clock the token's expiry
+            is compared to. Defaults to `time.time`.
+    """
+
+    def __init__(self, key_cache, maxsize=4096, timer=time.time):
+        self.key_cache = key_cache
+        self.timer = timer
+
+        self._claims = LRUCache(maxsize=maxsize)
+
+    def verify(self, token):
+        """Returns the claims of the given ID token.
+
+        Args:
+            token (string): The ID token sent by the client.
+
+        Raises:
+            ValueError: This will be raised if the token is empty.
+            InvalidIdTokenError: This will be raised if the token is invalid.
+            ExpiredIdTokenError: This will be raised if the token has expired.
+
+        Returns:
+            dict: The verified claims.
+        """
+
+        if not token:
+            raise ValueError('Illegal ID token provided, it must be a non-empty string.')
+
+        digest = hashlib.sha256(token.encode()).digest()
+
+        claims = self._claims.get(digest)
+        if claims is None:
+            claims = self._verify(token)
+
+            max_age = current_app.config.get('ID_TOKEN_CACHE_TTL', 300)
+            ttl = min(max_age, claims['exp'] - self.timer())
+            if ttl > 0:
+                self._claims.set(digest, claims, ttl=ttl)
+
+        return dict(claims)
+
+    def clear(self):
+        """Removes all the cached tokens."""
+
+        self._claims.clear()
+
+    def _verify(self, token):
+        """Checks the token's header, signature and claims."""
+
+        project_id = firebase_admin.get_app().project_id
+
+        try:
+            header = jwt.decode_header(token)
+        except ValueError as error:
+            raise InvalidIdTokenError(str(error), cause=error) from error
+
+        if header.get('alg') != 'RS256':
+            raise InvalidIdTokenError('Firebase ID token has incorrect algorithm.')
+
+        key_id = header.get('kid')
+        if not key_id:
+            raise InvalidIdTokenError('Firebase ID token has no "kid" claim.')
+
+        certs = self.key_cache.get()
+        if key_id not in certs:
+            # the keys are rotated, the token may be signed by a new one
+            certs = self.key_cache.get(refresh=True)
+            if key_id not in certs:
+                raise InvalidIdTokenError(
+                    'Firebase ID token has a "kid" claim that does not match a public key.'
+                )
+
+        try:
+            claims = jwt.decode(token, certs=certs, audience=project_id)
+        except (ValueError, google.auth.exceptions.GoogleAuthError) as error:
+            if 'Token expired' in str(error):
+                raise ExpiredIdTokenError(str(error), cause=error) from error
+            raise InvalidIdTokenError(str(error), cause=error) from error
+
+        if claims.get('iss') != ID_TOKEN_ISSUER_PREFIX + project_id:
+            raise InvalidIdTokenError('Firebase ID token has incorrect "iss" (issuer) claim.')
+
+        subject = claims.get('sub')
+        if not subject or not isinstance(subject, str) or len(subject) > 128:
+            raise InvalidIdTokenError('Firebase ID token has an invalid "sub" (subject) claim.')
+
+        claims['uid'] = subject
+        return claims
+
+
+public_keys = PublicKeyCache()
+id_token_verifier = IdTokenVerifier(public_keys)
@@ -1,10 +1,11 @@
 """This module contains the users API."""
 
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from flask_restful import abort, marshal_with, Resource
+from flask_restful import abort, Resource
 
 from . import db_client
 from .fields import user_fields
+from .serializers import marshal_with
 from .utils import admin_only
 
 
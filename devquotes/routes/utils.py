@@ -39,3 +39,34 @@ def get_quote_or_404(quote_id, user_id=None):
         abort(404)
 
     return quote
+
+
+def comma_separated_ids(total_allowed):
+    """Returns a `reqparse` type for a list of ids, given either as
+    a list or as a comma-separated string.
+
+    Args:
+        total_allowed (int): The maximum total of unique ids.
+
+    Returns:
+        callable: The type that returns the unique ids as integers,
+            raising `ValueError` with an appropriate message.
+    """
+
+    def parse(value):
+        items = value.split(',') if isinstance(value, str) else value
+
+        if not isinstance(items, list) or not all(str(i).isdigit() for i in items):
+            raise ValueError('Invalid type, each id must be type of integer')
+
+        ids = list(dict.fromkeys(int(i) for i in items))
+
+        if len(ids) > total_allowed:
+            raise ValueError(
+                f'A total of {total_allowed} '
+                f'{"ids are" if total_allowed > 1 else "id is"} allowed'
+            )
+
+        return ids
+
+    return parse
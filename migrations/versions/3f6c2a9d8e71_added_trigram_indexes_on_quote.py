@@ -0,0 +1,47 @@
+"""added trigram indexes on quote table
+
+Revision ID: 3f6c2a9d8e71
+Revises: b7d41e0c93fa
+Create Date: 2026-10-18 17:20:44.902316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f6c2a9d8e71'
+down_revision = 'b7d41e0c93fa'
+branch_labels = None
+depends_on = None
+
+# name, column
+indexes = [
+    ('ix_quote_author_trgm', 'author'),
+    ('ix_quote_quotation_trgm', 'quotation'),
+]
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # the indexes are built without locking out the writes, which
+    # can't be done inside the migration's transaction
+    with op.get_context().autocommit_block():
+        for name, column in indexes:
+            # an interrupted concurrent build leaves an invalid index behind
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+            op.create_index(
+                name, 'quote', [column], unique=False,
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(indexes):
+            op.drop_index(name, table_name='quote', postgresql_concurrently=True)
+
+    # the extension is kept, it may be used outside of this app
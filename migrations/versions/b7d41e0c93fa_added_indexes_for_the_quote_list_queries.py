@@ -0,0 +1,40 @@
+"""added indexes for the quote list queries
+
+Revision ID: b7d41e0c93fa
+Revises: e81f5a2c6b90
+Create Date: 2026-10-18 15:42:10.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d41e0c93fa'
+down_revision = 'e81f5a2c6b90'
+branch_labels = None
+depends_on = None
+
+# name, table, columns
+indexes = [
+    ('ix_quote_status_id_created_at', 'quote', ['status_id', 'created_at', 'id']),
+    ('ix_quote_contributor_id', 'quote', ['contributor_id']),
+    ('ix_like_user_id_created_at', 'like', ['user_id', 'created_at']),
+    ('ix_like_quote_id', 'like', ['quote_id']),
+]
+
+
+def upgrade():
+    # the indexes are built without locking out the writes, which
+    # can't be done inside the migration's transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in indexes:
+            # an interrupted concurrent build leaves an invalid index behind
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(indexes):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
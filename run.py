@@ -9,6 +9,7 @@ from devquotes.models.like import Like
 from devquotes.models.quote import Quote
 from devquotes.models.quote_status import QuoteStatus
 from devquotes.models.user import User
+from devquotes.routes.counters import LikeCounterFlusher
 
 app = create_app(config_class=os.environ['CONFIG_CLASS'])
 cli.register(app)
@@ -35,6 +36,16 @@ def create_database_tables():
     db.create_all()
 
 
+@app.before_first_request
+def start_like_counter_flusher():
+    """Starts folding the like deltas into the quotes in the background,
+    once per worker and only when serving, the CLI commands don't."""
+
+    flush_interval = app.config.get('LIKE_COUNTER_FLUSH_INTERVAL')
+    if flush_interval:
+        LikeCounterFlusher(app, flush_interval).start()
+
+
 def main():
     """The starting point of the app."""
 
@@ -6,6 +6,7 @@ from contextlib import contextmanager
 
 import pytest
 import testing.postgresql as postgresql
+from sqlalchemy import create_engine
 from sqlalchemy.orm import class_mapper
 from sqlalchemy.orm.mapper import configure_mappers
 
@@ -14,7 +15,9 @@ from devquotes import create_app
 from devquotes.models import db
 from devquotes.models.quote import Quote
 from devquotes.models.quote_status import QuoteStatus
+from devquotes.models.routing import REPLICA_BIND
 from devquotes.models.user import User
+from devquotes.routes.response_cache import response_cache
 
 dir_path = os.path.dirname(os.path.realpath(__file__))
 
@@ -70,6 +73,7 @@ def setup_and_teardown_app(postgres):
         """Application config to use."""
 
         SQLALCHEMY_DATABASE_URI = postgres.url()
+        FIREBASE_PUBLIC_KEYS_FILE = f'{dir_path}/data/id-token-public-keys.json'
 
     return create_app(TestingConfig)
 
@@ -108,6 +112,57 @@ def seed(database, app):  # pylint: disable=unused-argument
     db.session.commit()
 
 
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """Clears the anonymous responses, the tests may change
+    the config they're rendered with."""
+
+    response_cache.clear()
+
+
+@pytest.fixture(name='pg_trgm')
+def setup_pg_trgm(database):
+    """Creates the `pg_trgm` extension, the test is skipped if it's
+    not available."""
+
+    available = database.session.execute(
+        "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+    ).scalar()
+    if not available:
+        pytest.skip('pg_trgm is not available')
+
+    database.session.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    database.session.commit()
+
+
+@pytest.fixture(name='replica', scope='module')
+def setup_and_teardown_replica(app, seed):  # pylint: disable=unused-argument
+    """Setups and teardowns for a read replica, a second database with
+    the users and the quote statuses but none of the quotes, so the reads
+    it serves can be told apart."""
+
+    # pylint: disable=invalid-name
+    Postgresql = postgresql.PostgresqlFactory(cache_initialized_db=True)
+    postgres = Postgresql()
+
+    engine = create_engine(postgres.url())
+    db.metadata.create_all(engine)
+    for model in (User, QuoteStatus):
+        rows = db.session.execute(model.__table__.select()).fetchall()
+        engine.execute(model.__table__.insert(), [dict(row) for row in rows])
+    engine.dispose()
+
+    app.config['SQLALCHEMY_BINDS'] = {REPLICA_BIND: postgres.url()}
+    yield postgres
+
+    db.session.rollback()
+    db.get_engine(app, bind=REPLICA_BIND).dispose()
+    app.config['SQLALCHEMY_BINDS'] = {}
+
+    postgres.stop()
+    Postgresql.clear_cache()
+
+
 @pytest.fixture(name='user', scope='module')
 def setup_and_teardown_user():
     """Setups and teardowns for a user."""
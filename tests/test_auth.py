@@ -1,20 +1,61 @@
 """This module contains authorization related tests."""
 
+import os
+import time
+from types import SimpleNamespace
 from unittest import mock
 
+import firebase_admin
+import pytest
+from firebase_admin.auth import InvalidIdTokenError
+from google.auth import crypt, jwt
+
+from devquotes.routes.tokens import (
+    ID_TOKEN_ISSUER_PREFIX,
+    IdTokenVerifier,
+    PublicKeyCache,
+    id_token_verifier,
+)
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+
+
+def create_id_token(user, expires_in=3600, key_id='test-key', **claims):
+    """Helper for creating an ID token of the user signed with the local test key,
+    the claims set to `None` are left out."""
+
+    with open(f'{dir_path}/data/id-token-private-key.pem') as key_file:
+        signer = crypt.RSASigner.from_string(key_file.read(), key_id=key_id)
+
+    project_id = firebase_admin.get_app().project_id
+    now = int(time.time())
+
+    payload = {
+        'iss': ID_TOKEN_ISSUER_PREFIX + project_id,
+        'aud': project_id,
+        'sub': user.firebase_user_id,
+        'user_id': user.firebase_user_id,
+        'name': user.name,
+        'picture': user.picture_url,
+        'iat': now,
+        'exp': now + expires_in,
+        **claims,
+    }
+
+    # Firebase leaves out the claims the account doesn't have
+    payload = {key: value for key, value in payload.items() if value is not None}
+
+    return jwt.encode(signer, payload).decode()
+
 
 def login(client, user):
     """Helper for logging in user."""
 
-    with mock.patch('devquotes.routes.auth.auth.verify_id_token') as magic_mock:
-        magic_mock.return_value = {
-            'user_id': user.firebase_user_id,
-        }
-        post_data = {
-            'token': 'firebase_user_id_token'
-        }
+    post_data = {
+        'token': create_id_token(user)
+    }
 
-        return client.post('/v1/auth/token', data=post_data)
+    return client.post('/v1/auth/token', data=post_data)
 
 
 def logout(client):
@@ -58,3 +99,135 @@ def test_revoke(client, user):
     assert resp.status_code == 204
     assert 'access_token_cookie' not in cookie_names
     assert 'refresh_token_cookie' not in cookie_names
+
+
+def test_jwt_not_reused(app, user):
+    """Tests an anonymous request right after an authenticated one not
+    being served as the previous user."""
+
+    client = app.test_client()
+    login(client, user)
+    resp = client.get('/v1/quotes')
+    assert resp.headers['Cache-Control'] == 'private, no-cache'
+
+    resp = app.test_client().get('/v1/quotes')
+    assert resp.headers['Cache-Control'] == 'public, no-cache'
+    assert not any(quote['data']['is_liked'] for quote in resp.json['data'])
+
+
+def test_token_invalid(client, user):
+    """Tests login with tokens that fail verification."""
+
+    expired_token = create_id_token(user, expires_in=-60)
+    resp = client.post('/v1/auth/token', data={'token': expired_token})
+    assert resp.status_code == 401
+
+    forged_token = create_id_token(user)[:-4] + 'AAAA'
+    resp = client.post('/v1/auth/token', data={'token': forged_token})
+    assert resp.status_code == 401
+
+
+def test_token_cached(client, user):
+    """Tests logging in twice with a token verifying its signature once."""
+
+    id_token_verifier.clear()
+    token = create_id_token(user)
+
+    with mock.patch('devquotes.routes.tokens.jwt.decode', wraps=jwt.decode) as magic_mock:
+        for _ in range(2):
+            resp = client.post('/v1/auth/token', data={'token': token})
+            assert resp.status_code == 200
+
+    assert magic_mock.call_count == 1
+
+
+def test_public_keys_file_ignored_when_not_testing(app):
+    """Tests the local public keys being ignored outside of testing,
+    Google's public keys are fetched instead."""
+
+    public_keys = PublicKeyCache()
+    google_certs = {'google-key': 'certificate'}
+
+    with mock.patch.object(public_keys, '_fetch', return_value=(google_certs, 60)):
+        assert 'test-key' in public_keys.get()
+
+        app.config['TESTING'] = False
+        try:
+            assert public_keys.get() == google_certs
+        finally:
+            app.config['TESTING'] = True
+
+
+def test_unknown_key_id_throttled(app, user):
+    """Tests a burst of tokens signed by unknown keys fetching
+    Google's public keys at most once."""
+
+    public_keys = PublicKeyCache()
+    verifier = IdTokenVerifier(public_keys)
+
+    app.config['TESTING'] = False
+    try:
+        with mock.patch.object(
+            public_keys, '_fetch', return_value=({'google-key': 'certificate'}, 3600)
+        ) as fetch_mock:
+            for i in range(5):
+                token = create_id_token(user, key_id=f'made-up-key-{i}')
+                with pytest.raises(InvalidIdTokenError):
+                    verifier.verify(token)
+    finally:
+        app.config['TESTING'] = True
+
+    assert fetch_mock.call_count == 1
+
+
+def test_token_upsert(client, user):
+    """Tests login creating a new user and refreshing an existing user."""
+
+    new_user = SimpleNamespace(
+        firebase_user_id='new_firebase_user_id',
+        name='Jane Doe',
+        picture_url=None,
+    )
+    resp = client.post('/v1/auth/token', data={'token': create_id_token(new_user)})
+
+    assert resp.status_code == 200
+    assert resp.json['data']['name'] == 'Jane Doe'
+    assert resp.json['data']['stats'] == {'total_likes': 0, 'total_submitted': 0}
+
+    renamed_user = SimpleNamespace(
+        firebase_user_id=user.firebase_user_id,
+        name='John Smith',
+        picture_url='https://example.com/john.png',
+    )
+    resp = client.post('/v1/auth/token', data={'token': create_id_token(renamed_user)})
+
+    assert resp.status_code == 200
+    assert resp.json['data']['id'] == user.id
+    assert resp.json['data']['name'] == 'John Smith'
+    assert resp.json['data']['picture_url'] == 'https://example.com/john.png'
+
+
+def test_token_without_name(client):
+    """Tests login with accounts that have no display name."""
+
+    email_user = SimpleNamespace(
+        firebase_user_id='email_firebase_user_id',
+        name=None,
+        picture_url=None,
+    )
+    token = create_id_token(email_user, email='jane.doe@example.com')
+    resp = client.post('/v1/auth/token', data={'token': token})
+
+    assert resp.status_code == 200
+    assert resp.json['data']['name'] == 'jane.doe'
+
+    phone_user = SimpleNamespace(
+        firebase_user_id='phone_firebase_user_id',
+        name=None,
+        picture_url=None,
+    )
+    token = create_id_token(phone_user, phone_number='+15555550100')
+    resp = client.post('/v1/auth/token', data={'token': token})
+
+    assert resp.status_code == 200
+    assert resp.json['data']['name'] == '+15555550100'
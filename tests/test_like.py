@@ -4,6 +4,8 @@ import pytest
 
 from .test_auth import login
 from .utils.assertions import (
+    assert_index_scans,
+    assert_max_queries,
     assert_valid_schema,
     assert_valid_status_code
 )
@@ -26,11 +28,34 @@ class Actions:
 
         return self.client.delete(f'/v1/likes/{quote_id}')
 
+    def like_many(self, *quote_ids):
+        """Likes multiple quotes."""
+
+        post_data = {'ids': ','.join(str(i) for i in quote_ids)}
+        return self.client.post('/v1/likes/batch', data=post_data)
+
+    def unlike_many(self, *quote_ids):
+        """Unlikes multiple quotes."""
+
+        params = ','.join(str(i) for i in quote_ids)
+        return self.client.delete(f'/v1/likes/batch?ids={params}')
+
     def get_favorites(self):
         """Gets all liked quotes."""
 
         return self.client.get('/v1/likes')
 
+    def get_quotes(self):
+        """Gets quotes."""
+
+        return self.client.get('/v1/quotes')
+
+    def get_quote(self, quote_id, etag=None):
+        """Gets quote by id, revalidates the given ETag if any."""
+
+        headers = {'If-None-Match': etag} if etag else {}
+        return self.client.get(f'/v1/quotes/{quote_id}', headers=headers)
+
 
 class TestViewer:
     """Class for testing unauthenticated user."""
@@ -60,6 +85,18 @@ class TestViewer:
         resp = self.actions.unlike(quote.id)
         assert_valid_status_code(resp, 401)
 
+    def test_like_many(self, quotes):
+        """Tests unauthenticated user liking multiple quotes."""
+
+        resp = self.actions.like_many(*[q.id for q in quotes])
+        assert_valid_status_code(resp, 401)
+
+    def test_unlike_many(self, quotes):
+        """Tests unauthenticated user unliking multiple quotes."""
+
+        resp = self.actions.unlike_many(*[q.id for q in quotes])
+        assert_valid_status_code(resp, 401)
+
 
 class TestAuthenticatedUser:
     """Class for testing authenticated user."""
@@ -89,6 +126,36 @@ class TestAuthenticatedUser:
         resp = self.actions.get_favorites()
         assert resp.json['total'] == 1
 
+    def test_like_modifies_quote(self, quote):
+        """Tests authenticated user revalidating a quote after liking it."""
+
+        resp = self.actions.get_quote(quote.id)
+        etag = resp.headers['ETag']
+
+        resp = self.actions.get_quote(quote.id, etag)
+        assert_valid_status_code(resp, 304)
+
+        self.actions.unlike(quote.id)
+        self.actions.like(quote.id)
+
+        resp = self.actions.get_quote(quote.id, etag)
+        assert_valid_status_code(resp, 200)
+        assert resp.json['data']['is_liked']
+
+    def test_flush_like_counters(self, quote):
+        """Tests quote's total likes catching up with its likes on flush."""
+
+        # pylint: disable=import-outside-toplevel
+        from devquotes.routes.db_client import flush_like_counters
+
+        resp = self.actions.get_quote(quote.id)
+        assert resp.json['data']['total_likes'] == 0
+
+        flush_like_counters()
+
+        resp = self.actions.get_quote(quote.id)
+        assert resp.json['data']['total_likes'] == 1
+
     def test_unlike(self, quote):
         """Tests authenticated user unliking a quote."""
 
@@ -98,3 +165,64 @@ class TestAuthenticatedUser:
 
         resp = self.actions.get_favorites()
         assert resp.json['total'] == 0
+
+    def test_like_many(self, quotes):
+        """Tests authenticated user liking multiple quotes."""
+
+        ids = [q.id for q in quotes]
+        self.actions.like(ids[0])
+
+        resp = self.actions.like_many(*ids)
+        assert_valid_status_code(resp, 200)
+        assert resp.json == [{'id': i, 'success': i != ids[0]} for i in ids]
+
+        # only published quotes are listed on favorites
+        resp = self.actions.get_favorites()
+        assert resp.json['total'] == sum(q.status.name == 'published' for q in quotes)
+
+    def test_get_favorites_queries(self):
+        """Tests authenticated user getting its liked quotes without
+        a query per quote, the page and its total are two statements."""
+
+        with assert_max_queries(2):
+            resp = self.actions.get_favorites()
+
+        assert_valid_status_code(resp, 200)
+        assert len(resp.json['data']) > 1
+
+    def test_get_favorites_index_scans(self):
+        """Tests authenticated user getting its liked quotes without
+        scanning the likes or the quotes."""
+
+        with assert_index_scans('quote', 'like'):
+            resp = self.actions.get_favorites()
+
+        assert_valid_status_code(resp, 200)
+
+    def test_get_shared_quotes(self, app):
+        """Tests authenticated user getting the quotes page cached for
+        anonymous users, only the user's likes are laid over it."""
+
+        resp = Actions(app.test_client()).get_quotes()
+        assert not any(q['data']['is_liked'] for q in resp.json['data'])
+
+        # the ETag's versions and the user's likes on the page
+        with assert_max_queries(2):
+            resp = self.actions.get_quotes()
+
+        assert_valid_status_code(resp, 200)
+        assert_valid_schema(resp, 'quotes.json')
+        assert all(q['data']['is_liked'] for q in resp.json['data'])
+
+    def test_unlike_many(self, quotes):
+        """Tests authenticated user unliking multiple quotes."""
+
+        ids = [q.id for q in quotes]
+        unknown_id = max(ids) + 1
+
+        resp = self.actions.unlike_many(*ids, unknown_id)
+        assert_valid_status_code(resp, 200)
+        assert resp.json == [{'id': i, 'success': i != unknown_id} for i in ids + [unknown_id]]
+
+        resp = self.actions.get_favorites()
+        assert resp.json['total'] == 0
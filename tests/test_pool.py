@@ -0,0 +1,111 @@
+"""This module contains connection pool metrics related tests."""
+
+import pytest
+
+from devquotes.models import db
+
+from .test_auth import login
+from .utils.assertions import assert_valid_status_code
+
+
+class Actions:
+    """Class for common actions."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def get_pool(self):
+        """Gets the connection pool metrics."""
+
+        return self.client.get('/v1/_internal/pool')
+
+    def get_quotes(self):
+        """Gets quotes."""
+
+        return self.client.get('/v1/quotes')
+
+
+class TestContributor:
+    """Class for testing authenticated user."""
+
+    @pytest.fixture(autouse=True)
+    def init(self, client, user):
+        """Initializes the actions."""
+
+        # pylint: disable=attribute-defined-outside-init
+        login(client, user)
+        self.actions = Actions(client)
+
+    def test_get_pool(self):
+        """Tests authenticated user getting the pool metrics."""
+
+        resp = self.actions.get_pool()
+        assert_valid_status_code(resp, 403)
+
+
+class TestAdmin:
+    """Class for testing admin user."""
+
+    @pytest.fixture(autouse=True)
+    def init(self, client, user_admin):
+        """Initializes the actions."""
+
+        # pylint: disable=attribute-defined-outside-init
+        login(client, user_admin)
+        self.actions = Actions(client)
+
+    def test_get_pool(self, app):
+        """Tests admin user getting the pool metrics."""
+
+        resp = self.actions.get_pool()
+        assert_valid_status_code(resp, 200)
+
+        data = resp.json['data']
+        options = app.config['SQLALCHEMY_ENGINE_OPTIONS']
+        assert data['pool']['size'] == options['pool_size']
+        assert data['pool']['max_overflow'] == options['max_overflow']
+        assert data['pool']['checked_out'] >= 1
+
+        buckets = data['metrics']['latency']['buckets']
+        assert buckets[-1] == {'le': None, 'count': data['metrics']['checkouts']}
+        assert [b['count'] for b in buckets] == sorted(b['count'] for b in buckets)
+        assert data['replica'] is None
+
+        database = data['database']
+        assert 0 < database['connections'] <= database['max_connections']
+
+    def test_get_pool_invalidations(self):
+        """Tests admin user getting the pool metrics after a connection
+        is checked out and invalidated."""
+
+        metrics = self.actions.get_pool().json['data']['metrics']
+
+        conn = db.engine.connect()
+        conn.invalidate()
+        conn.close()
+
+        resp = self.actions.get_pool()
+        assert_valid_status_code(resp, 200)
+
+        data = resp.json['data']['metrics']
+        assert data['checkouts'] > metrics['checkouts']
+        assert data['invalidations'] == metrics['invalidations'] + 1
+
+    def test_get_pool_replica(self, replica):  # pylint: disable=unused-argument
+        """Tests admin user getting the primary's and the replica's pool
+        metrics apart after getting quotes from the replica."""
+
+        before = self.actions.get_pool().json['data']
+
+        resp = self.actions.get_quotes()
+        assert_valid_status_code(resp, 200)
+
+        resp = self.actions.get_pool()
+        assert_valid_status_code(resp, 200)
+
+        data = resp.json['data']
+        assert data['metrics']['checkouts'] == before['metrics']['checkouts']
+        assert data['replica']['metrics']['checkouts'] == (
+            before['replica']['metrics']['checkouts'] + 1)
+        assert data['replica']['metrics']['connects'] >= 1
+        assert data['replica']['pool']['checked_out'] >= 1
@@ -1,13 +1,24 @@
 """This module contains quote related tests."""
 
+import time
+from unittest import mock
+
 import pytest
+from flask import Flask
+
+from devquotes.routes import init_app
+from devquotes.routes.randomizer import quote_decks
+from devquotes.routes.response_cache import response_cache
 
 from .test_auth import login
 from .utils.assertions import (
+    assert_index_scans,
+    assert_max_queries,
     assert_valid_schema,
     assert_valid_status_code,
     assert_valid_search_results,
 )
+from .utils.memcached import MemcachedStub
 
 
 class Actions:
@@ -16,10 +27,11 @@ class Actions:
     def __init__(self, client):
         self.client = client
 
-    def get_quotes(self):
-        """Gets quotes."""
+    def get_quotes(self, etag=None):
+        """Gets quotes, revalidates the given ETag if any."""
 
-        return self.client.get('/v1/quotes')
+        headers = {'If-None-Match': etag} if etag else {}
+        return self.client.get('/v1/quotes', headers=headers)
 
     def filter_quotes(self, **filters):
         """Filters quotes."""
@@ -27,16 +39,27 @@ class Actions:
         params = '&'.join(f'{k}={v}' for k, v in filters.items())
         return self.client.get(f'/v1/quotes?{params}')
 
-    def get_quote(self, quote_id):
-        """Gets quote by id."""
+    def get_quotes_by_cursor(self, cursor='', per_page=1):
+        """Gets quotes using cursor pagination."""
+
+        return self.client.get(f'/v1/quotes?cursor={cursor}&per_page={per_page}')
 
-        return self.client.get(f'/v1/quotes/{quote_id}')
+    def get_quote(self, quote_id, etag=None):
+        """Gets quote by id, revalidates the given ETag if any."""
+
+        headers = {'If-None-Match': etag} if etag else {}
+        return self.client.get(f'/v1/quotes/{quote_id}', headers=headers)
 
     def get_random_quote(self):
         """Gets random quote."""
 
         return self.client.get('/v1/quotes/random')
 
+    def get_deck_quote(self):
+        """Gets the next quote from the user's shuffled deck."""
+
+        return self.client.get('/v1/quotes/random?mode=deck')
+
     def get_unidentified_quote(self):
         """Gets quote that doesn't exists."""
 
@@ -47,10 +70,16 @@ class Actions:
 
         return self.client.get(f'/v1/quotes/{quote_id}/contributor')
 
-    def search_quotes(self, query):
+    def search_quotes(self, query, **params):
         """Searches quotes."""
 
-        return self.client.get(f'/v1/quotes?query={query}')
+        params = ''.join(f'&{k}={v}' for k, v in params.items())
+        return self.client.get(f'/v1/quotes?query={query}{params}')
+
+    def suggest_quotes(self, query):
+        """Gets the suggested authors and quotes."""
+
+        return self.client.get(f'/v1/quotes/suggest?q={query}')
 
     def create_quote(self):
         """Creates quote."""
@@ -108,6 +137,50 @@ class TestViewer:
         assert_valid_status_code(resp, 200)
         assert_valid_schema(resp, 'quotes.json')
 
+    def test_get_quotes_by_cursor(self):
+        """Tests unauthenticated user paging through quotes by cursor."""
+
+        first_page = self.actions.get_quotes_by_cursor()
+        assert_valid_status_code(first_page, 200)
+        assert_valid_schema(first_page, 'quotes.json')
+        assert first_page.json['total'] is None
+        assert first_page.json['prev_cursor'] is None
+
+        next_page = self.actions.get_quotes_by_cursor(first_page.json['next_cursor'])
+        assert_valid_status_code(next_page, 200)
+        assert next_page.json['data'][0] != first_page.json['data'][0]
+
+        prev_page = self.actions.get_quotes_by_cursor(next_page.json['prev_cursor'])
+        assert_valid_status_code(prev_page, 200)
+        assert prev_page.json['data'] == first_page.json['data']
+
+    @pytest.mark.parametrize('strategy', ['exact', 'cached', 'estimated', 'omitted'])
+    def test_get_quotes_total_strategy(self, app, strategy):
+        """Tests unauthenticated user getting quotes with each total strategy."""
+
+        with mock.patch.dict(app.config, QUOTES_TOTAL_STRATEGY=strategy):
+            resp = self.actions.get_quotes()
+
+        assert_valid_status_code(resp, 200)
+        assert_valid_schema(resp, 'quotes.json')
+        assert resp.json['total_strategy'] == strategy
+        assert (resp.json['total'] is None) == (strategy == 'omitted')
+
+    def test_invalid_total_strategy(self):
+        """Tests the app failing to start with an unknown total strategy."""
+
+        app = Flask(__name__)
+        app.config['QUOTES_TOTAL_STRATEGY'] = 'approximate'
+
+        with pytest.raises(ValueError, match='approximate'):
+            init_app(app)
+
+    def test_get_quotes_by_invalid_cursor(self):
+        """Tests unauthenticated user paging through quotes by a malformed cursor."""
+
+        resp = self.actions.get_quotes_by_cursor('invalid')
+        assert_valid_status_code(resp, 400)
+
     def test_filter_quotes(self):
         """Tests unauthenticated user filtering quotes."""
 
@@ -129,6 +202,66 @@ class TestViewer:
         assert_valid_status_code(resp, 200)
         assert_valid_schema(resp, 'quote.json')
 
+    def test_get_quote_not_modified(self, quote):
+        """Tests unauthenticated user revalidating a quote."""
+
+        resp = self.actions.get_quote(quote.id)
+        etag = resp.headers['ETag']
+
+        resp = self.actions.get_quote(quote.id, etag)
+        assert_valid_status_code(resp, 304)
+        assert resp.headers['ETag'] == etag
+        assert not resp.data
+
+    def test_get_quotes_not_modified(self):
+        """Tests unauthenticated user revalidating quotes."""
+
+        resp = self.actions.get_quotes()
+        etag = resp.headers['ETag']
+
+        resp = self.actions.get_quotes(etag)
+        assert_valid_status_code(resp, 304)
+        assert not resp.data
+
+    def test_get_quotes_cached(self):
+        """Tests unauthenticated user getting quotes from the response cache."""
+
+        resp = self.actions.get_quotes()
+        assert resp.headers['Cache-Control'] == 'public, no-cache'
+        assert resp.headers['Vary'] == 'Cookie'
+
+        # only the quotes version is read
+        with assert_max_queries(1):
+            cached = self.actions.get_quotes()
+
+        assert_valid_status_code(cached, 200)
+        assert cached.data == resp.data
+        assert cached.headers['ETag'] == resp.headers['ETag']
+        assert cached.headers['Content-Type'] == 'application/json'
+
+    def test_get_quotes_cached_by_socket(self, app, tmp_path):
+        """Tests unauthenticated user getting quotes from an external cache."""
+
+        path = str(tmp_path / 'memcached.sock')
+        config = {'RESPONSE_CACHE_BACKEND': 'socket', 'RESPONSE_CACHE_SOCKET': path}
+
+        with MemcachedStub(path) as memcached, mock.patch.dict(app.config, config):
+            response_cache.reset()
+            try:
+                resp = self.actions.get_quotes()
+                assert list(memcached.values.values()) == [resp.data]
+
+                with assert_max_queries(1):
+                    cached = self.actions.get_quotes()
+
+                # the shared cache isn't flushed, the stale bodies expire
+                response_cache.clear()
+                assert list(memcached.values.values()) == [resp.data]
+            finally:
+                response_cache.reset()
+
+        assert cached.data == resp.data
+
     def test_get_random_quote(self):
         """Tests unauthenticated user getting a random quote."""
 
@@ -136,6 +269,37 @@ class TestViewer:
         assert_valid_status_code(resp, 200)
         assert_valid_schema(resp, 'quote.json')
 
+    def test_get_deck_quotes(self, quotes):
+        """Tests unauthenticated user drawing random quotes without repeats,
+        once it has a session."""
+
+        total_published = sum(q.status.name == 'published' for q in quotes)
+        quote_ids = set()
+
+        resp = self.actions.get_deck_quote()
+        assert_valid_status_code(resp, 200)
+
+        for _ in range(total_published):
+            resp = self.actions.get_deck_quote()
+            assert_valid_status_code(resp, 200)
+            assert_valid_schema(resp, 'quote.json')
+            quote_ids.add(resp.json['data']['id'])
+
+        assert len(quote_ids) == total_published
+
+    def test_get_deck_quote_without_session(self, app):
+        """Tests unauthenticated user without a session cookie getting
+        a random quote without shuffling a deck."""
+
+        total_decks = len(quote_decks)
+
+        for _ in range(3):
+            resp = app.test_client(use_cookies=False).get('/v1/quotes/random?mode=deck')
+            assert_valid_status_code(resp, 200)
+            assert_valid_schema(resp, 'quote.json')
+
+        assert len(quote_decks) == total_decks
+
     def test_get_unidentified_quote(self):
         """Tests unauthenticated user getting a non-existing quote."""
 
@@ -157,6 +321,131 @@ class TestViewer:
         assert_valid_search_results(resp, quote.quotation)
         assert resp.json['total'] >= 1
 
+    def test_search_quotes_by_prefix(self):
+        """Tests unauthenticated user searching quotes as they type."""
+
+        resp = self.actions.search_quotes('stupid progr')
+        assert_valid_status_code(resp, 200)
+        assert_valid_search_results(resp, 'programming')
+        assert resp.json['total'] == 1
+
+    def test_search_quotes_fuzzy(self, app, pg_trgm):
+        """Tests unauthenticated user searching quotes with a misspelled query."""
+
+        # pylint: disable=unused-argument
+
+        with mock.patch.dict(app.config, SEARCH_FUZZY_MIN_HITS=3):
+            resp = self.actions.search_quotes('Torvals')
+
+        assert_valid_status_code(resp, 200)
+        assert [q['data']['author'] for q in resp.json['data']] == ['Linus Torvalds']
+
+    def test_search_quotes_fuzzy_timeout(self, app):
+        """Tests unauthenticated user searching quotes when the fuzzy
+        search times out, only the full-text matches are returned."""
+
+        # pylint: disable=import-outside-toplevel
+        from devquotes.models import db
+
+        def rank_similar_quotes(*_):
+            db.session.execute('SELECT pg_sleep(1)')
+
+        config = {'SEARCH_FUZZY_MIN_HITS': 3, 'SEARCH_STATEMENT_TIMEOUT': 50}
+        with mock.patch.dict(app.config, config), mock.patch(
+            'devquotes.routes.search._rank_similar_quotes', side_effect=rank_similar_quotes
+        ) as rank_similar_quotes_mock:
+            started_at = time.monotonic()
+            resp = self.actions.search_quotes('code')
+            elapsed = time.monotonic() - started_at
+
+        assert rank_similar_quotes_mock.called
+        assert elapsed < 1
+        assert_valid_status_code(resp, 200)
+        assert [q['data']['author'] for q in resp.json['data']] == ['Linus Torvalds']
+
+    def test_search_quotes_timeout(self, app):
+        """Tests unauthenticated user searching quotes when the full-text
+        search times out, the search is unavailable but not the quotes."""
+
+        # pylint: disable=import-outside-toplevel
+        from devquotes.models import db
+
+        def rank_text_matches(*_):
+            db.session.execute('SELECT pg_sleep(1)')
+
+        config = {'SEARCH_STATEMENT_TIMEOUT': 50}
+        with mock.patch.dict(app.config, config), mock.patch(
+            'devquotes.routes.search._rank_text_matches', side_effect=rank_text_matches
+        ):
+            started_at = time.monotonic()
+            resp = self.actions.search_quotes('talk')
+            elapsed = time.monotonic() - started_at
+
+        assert elapsed < 1
+        assert_valid_status_code(resp, 503)
+
+        resp = self.actions.search_quotes('talk')
+        assert_valid_status_code(resp, 200)
+        assert [q['data']['author'] for q in resp.json['data']] == ['Linus Torvalds']
+
+        resp = self.actions.get_quotes()
+        assert_valid_status_code(resp, 200)
+
+    def test_search_quotes_highlighted(self):
+        """Tests unauthenticated user searching quotes with the matches marked."""
+
+        resp = self.actions.search_quotes('code', highlight='true')
+        assert_valid_status_code(resp, 200)
+        assert_valid_schema(resp, 'quotes.json')
+        assert resp.json['data'][0]['data']['highlight'] == \
+            'Talk is cheap. Show me the <mark>code</mark>.'
+
+        resp = self.actions.search_quotes('code')
+        assert 'highlight' not in resp.json['data'][0]['data']
+
+    def test_search_quotes_pages(self):
+        """Tests unauthenticated user paging through the search results
+        without ranking the matches again."""
+
+        first_page = self.actions.search_quotes('code or blame', per_page=1)
+        assert_valid_status_code(first_page, 200)
+        assert first_page.json['total'] == 2
+
+        # every page only reads the quotes version and the page's quotes
+        with assert_max_queries(6):
+            next_page = self.actions.search_quotes('code or blame', per_page=1, page=2)
+            first_cursor_page = self.actions.search_quotes('code or blame', per_page=1, cursor='')
+            next_cursor_page = self.actions.search_quotes(
+                'code or blame', per_page=1, cursor=first_cursor_page.json['next_cursor']
+            )
+
+        assert_valid_status_code(next_page, 200)
+        assert next_page.json['data'] != first_page.json['data']
+        assert next_cursor_page.json['data'] == next_page.json['data']
+        assert next_cursor_page.json['prev_cursor']
+
+    def test_suggest_quotes(self):
+        """Tests unauthenticated user getting suggestions as they type."""
+
+        resp = self.actions.suggest_quotes('torv')
+        assert_valid_status_code(resp, 200)
+        assert resp.json['data']['authors'] == ['Linus Torvalds']
+        assert resp.json['data']['quotes'] == []
+
+        resp = self.actions.suggest_quotes('show me the co')
+        quotes = resp.json['data']['quotes']
+        assert [q['quotation'] for q in quotes] == ['Talk is cheap. Show me the code.']
+
+        # the quotes that are not published are not suggested
+        resp = self.actions.suggest_quotes('foreach')
+        assert resp.json['data'] == {'authors': [], 'quotes': []}
+
+        # the suggestions are served from memory
+        with assert_max_queries(0):
+            resp = self.actions.suggest_quotes('a')
+
+        assert resp.json['data']['quotes']
+
     def test_create_quote(self):
         """Tests unauthenticated user creating a quote."""
 
@@ -242,6 +531,20 @@ class TestContributor:
         assert_valid_status_code(resp, 200)
         assert_valid_schema(resp, 'quote.json')
 
+    def test_get_deck_quotes(self, quotes):
+        """Tests authenticated user drawing random quotes without repeats."""
+
+        total_published = sum(q.status.name == 'published' for q in quotes)
+        quote_ids = set()
+
+        for _ in range(total_published):
+            resp = self.actions.get_deck_quote()
+            assert_valid_status_code(resp, 200)
+            assert_valid_schema(resp, 'quote.json')
+            quote_ids.add(resp.json['data']['id'])
+
+        assert len(quote_ids) == total_published
+
     def test_get_unidentified_quote(self):
         """Tests authenticated user getting a non-existing quote."""
 
@@ -320,6 +623,37 @@ class TestAdmin:
         assert_valid_status_code(resp, 200)
         assert_valid_schema(resp, 'quotes.json')
 
+    @pytest.mark.parametrize('url, max_queries', [
+        ('/v1/quotes', 4),
+        ('/v1/quotes?cursor=', 3),
+        ('/v1/quotes?query=code', 8),
+    ])
+    def test_get_quotes_queries(self, client, url, max_queries):
+        """Tests admin user getting quotes of mixed statuses without a
+        query per quote, only the ETag's versions, the page, its total
+        (or the search's ranking in its bounded savepoint) and the user's likes
+        on the page are queried."""
+
+        with assert_max_queries(max_queries):
+            resp = client.get(url)
+
+        assert_valid_status_code(resp, 200)
+
+    @pytest.mark.parametrize('url', [
+        '/v1/quotes',
+        '/v1/quotes?cursor=',
+        '/v1/quotes?status=pending_review',
+        '/v1/quotes?query=code',
+    ])
+    def test_get_quotes_index_scans(self, client, url):
+        """Tests admin user getting quotes without scanning the quotes."""
+
+        with assert_index_scans('quote', 'like') as queries:
+            resp = client.get(url)
+
+        assert_valid_status_code(resp, 200)
+        assert queries
+
     def test_filter_quotes(self):
         """Tests admin user filtering quotes."""
 
@@ -376,6 +710,58 @@ class TestAdmin:
         assert_valid_status_code(resp, 201)
         assert_valid_schema(resp, 'quote.json')
 
+    def test_get_modified_quotes(self, quote):
+        """Tests admin user revalidating quotes after a quote is updated."""
+
+        resp = self.actions.get_quotes()
+        etag = resp.headers['ETag']
+
+        self.actions.update_quote(quote.id, {'source': 'The Pragmatic Programmer'})
+
+        resp = self.actions.get_quotes(etag)
+        assert_valid_status_code(resp, 200)
+        assert resp.headers['ETag'] != etag
+
+    def test_suggest_published_quote(self):
+        """Tests admin user publishing and deleting a suggested quote."""
+
+        # loads the index, the changes are then applied to it
+        self.actions.suggest_quotes('a')
+
+        resp = self.actions.create_quote()
+        quote_id = resp.json['data']['id']
+
+        resp = self.actions.suggest_quotes('simplicity')
+        assert resp.json['data']['quotes'] == []
+
+        self.actions.publish_quote(quote_id)
+
+        resp = self.actions.suggest_quotes('simplicity is the soul of eff')
+        assert [q['id'] for q in resp.json['data']['quotes']] == [quote_id]
+
+        resp = self.actions.suggest_quotes('freem')
+        assert resp.json['data']['authors'] == ['Austin Freeman']
+
+        self.actions.delete_quote(quote_id)
+
+        resp = self.actions.suggest_quotes('freem')
+        assert resp.json['data'] == {'authors': [], 'quotes': []}
+
+    def test_update_cached_quotes(self, app, quote):
+        """Tests admin user updating a quote of the cached anonymous quotes."""
+
+        viewer = Actions(app.test_client())
+        resp = viewer.get_quotes()
+
+        resp = self.actions.get_quotes()
+        assert resp.headers['Cache-Control'] == 'private, no-cache'
+
+        self.actions.update_quote(quote.id, {'author': 'Anonymous'})
+
+        resp = viewer.get_quotes()
+        quotes = {q['data']['id']: q['data'] for q in resp.json['data']}
+        assert quotes[quote.id]['author'] == 'Anonymous'
+
     def test_update_quote(self, quote):
         """Tests admin user updating a quote."""
 
@@ -397,15 +783,26 @@ class TestAdmin:
         resp = self.actions.flag_quote_as_spam(quote.id)
         assert_valid_status_code(resp, 200)
 
+    def test_get_random_unpublished_quote(self, quote):
+        """Tests admin user never getting a random quote that is not published."""
+
+        for _ in range(10):
+            resp = self.actions.get_random_quote()
+            assert_valid_status_code(resp, 200)
+            assert resp.json['data']['id'] != quote.id
+
     def test_delete_quote(self, quote):
         """Tests admin user deleting a quote."""
 
         resp = self.actions.delete_quote(quote.id)
         assert_valid_status_code(resp, 204)
 
-    def test_delete_quotes(self, quotes):
+    def test_delete_quotes(self, quotes, quote):
         """Tests admin user deleting multiple quotes."""
 
         ids = [q.id for q in quotes]
         resp = self.actions.delete_quotes(*ids)
         assert_valid_status_code(resp, 200)
+
+        # `quote` is already deleted on `test_delete_quote`
+        assert resp.json == [{'id': i, 'success': i != quote.id} for i in ids]
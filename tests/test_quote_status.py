@@ -0,0 +1,57 @@
+"""This module contains quote status related tests."""
+
+import pytest
+
+from .test_auth import login
+from .utils.assertions import assert_valid_status_code
+
+
+class Actions:
+    """Class for common actions."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def get_quote_statuses(self):
+        """Gets all quote statuses."""
+
+        return self.client.get('/v1/quote-statuses')
+
+
+class TestContributor:
+    """Class for testing authenticated user."""
+
+    @pytest.fixture(autouse=True)
+    def init(self, client, user):
+        """Initializes the actions."""
+
+        # pylint: disable=attribute-defined-outside-init
+        login(client, user)
+        self.actions = Actions(client)
+
+    def test_get_quote_statuses(self):
+        """Tests authenticated user getting quote statuses."""
+
+        resp = self.actions.get_quote_statuses()
+        assert_valid_status_code(resp, 403)
+
+
+class TestAdmin:
+    """Class for testing admin user."""
+
+    @pytest.fixture(autouse=True)
+    def init(self, client, user_admin):
+        """Initializes the actions."""
+
+        # pylint: disable=attribute-defined-outside-init
+        login(client, user_admin)
+        self.actions = Actions(client)
+
+    def test_get_quote_statuses(self):
+        """Tests admin user getting quote statuses."""
+
+        resp = self.actions.get_quote_statuses()
+        assert_valid_status_code(resp, 200)
+
+        names = [status['data']['name'] for status in resp.json['data']]
+        assert names == ['published', 'pending_review', 'spam']
@@ -0,0 +1,84 @@
+"""This module contains read replica routing related tests."""
+
+import pytest
+
+from devquotes.routes.replica import STICKY_UNTIL_KEY
+
+from .test_auth import login
+from .utils.assertions import assert_valid_status_code
+
+
+class Actions:
+    """Class for common actions."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def like(self, quote_id):
+        """Likes quote."""
+
+        post_data = {'id': quote_id}
+        return self.client.post('/v1/likes', data=post_data)
+
+    def get_favorites(self):
+        """Gets all liked quotes."""
+
+        return self.client.get('/v1/likes')
+
+    def get_quotes(self):
+        """Gets quotes."""
+
+        return self.client.get('/v1/quotes')
+
+    def forget_writes(self):
+        """Lets the client read from the replica again."""
+
+        with self.client.session_transaction() as session:
+            session.pop(STICKY_UNTIL_KEY, None)
+
+
+class TestViewer:
+    """Class for testing unauthenticated user."""
+
+    @pytest.fixture(autouse=True)
+    def init(self, client, replica):  # pylint: disable=unused-argument
+        """Initializes the actions."""
+
+        # pylint: disable=attribute-defined-outside-init
+        self.actions = Actions(client)
+
+    def test_get_quotes(self):
+        """Tests unauthenticated user getting quotes from the replica."""
+
+        resp = self.actions.get_quotes()
+        assert_valid_status_code(resp, 200)
+        assert resp.json['data'] == []
+
+
+class TestContributor:
+    """Class for testing authenticated user."""
+
+    @pytest.fixture(autouse=True)
+    def init(self, client, user, replica):  # pylint: disable=unused-argument
+        """Initializes the actions."""
+
+        # pylint: disable=attribute-defined-outside-init
+        login(client, user)
+        self.actions = Actions(client)
+
+    def test_get_favorites_after_like(self, quote):
+        """Tests authenticated user reading its like from the primary
+        right after liking, and from the replica afterwards."""
+
+        resp = self.actions.like(quote.id)
+        assert_valid_status_code(resp, 200)
+
+        resp = self.actions.get_favorites()
+        assert_valid_status_code(resp, 200)
+        assert [q['data']['id'] for q in resp.json['data']] == [quote.id]
+
+        self.actions.forget_writes()
+
+        resp = self.actions.get_favorites()
+        assert_valid_status_code(resp, 200)
+        assert resp.json['data'] == []
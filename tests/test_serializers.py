@@ -0,0 +1,66 @@
+"""This module contains the compiled marshalling related tests."""
+
+import json
+
+import pytest
+from flask_restful import marshal
+
+from devquotes.models import db
+from devquotes.models.quote import Quote
+from devquotes.models.quote_status import QuoteStatus, quote_statuses
+from devquotes.routes.fields import quote_fields, quotes_fields, user_fields
+from devquotes.routes.pagination import paginate_by_offset
+from devquotes.routes.rows import QuoteRow
+from devquotes.routes.serializers import compile_fields
+
+
+@pytest.mark.parametrize('spec', [quote_fields, user_fields])
+def test_compile_fields(app, quote, user, spec):
+    """Tests the compiled fields matching `flask_restful.marshal`
+    byte-for-byte."""
+
+    serialize = compile_fields(spec)
+
+    with app.test_request_context('/v1/quotes'):
+        for obj in (quote, user, None):
+            assert json.dumps(serialize(obj)) == json.dumps(marshal(obj, spec))
+
+
+def test_compile_paginated_fields(app):
+    """Tests the compiled fields of a page of quotes matching
+    `flask_restful.marshal` byte-for-byte."""
+
+    serialize = compile_fields(quotes_fields)
+
+    with app.test_request_context('/v1/quotes'):
+        page = paginate_by_offset(Quote.query.order_by(Quote.id), page=1, per_page=2)
+        assert json.dumps(serialize(page)) == json.dumps(marshal(page, quotes_fields))
+
+
+def test_quote_row_status(app, quote):
+    """Tests the quote row reloading the cached statuses for a status
+    created by another process, and failing clearly for an unknown one."""
+
+    table = QuoteStatus.__table__
+    values = [None] * len(QuoteRow.columns())
+
+    with app.app_context():
+        quote_statuses.all()
+
+        # a core insert, so the cached statuses aren't invalidated
+        status_id = db.session.execute(
+            table.insert().values(name='archived', display_name='Archived')
+        ).inserted_primary_key[0]
+        db.session.commit()
+
+        try:
+            values[0], values[5] = quote.id, status_id
+            assert QuoteRow(*values).status.name == 'archived'
+
+            values[5] = status_id + 1
+            with pytest.raises(LookupError):
+                QuoteRow(*values)
+        finally:
+            db.session.execute(table.delete().where(table.c.id == status_id))
+            db.session.commit()
+            quote_statuses.invalidate()
@@ -2,6 +2,9 @@
 
 import pytest
 
+from devquotes.models import db
+from devquotes.models.user_stats import UserStats
+
 from .test_auth import login
 from .utils.assertions import (
     assert_valid_schema,
@@ -98,3 +101,46 @@ class TestAdmin:
         resp = self.actions.get_user(user.id)
         assert_valid_status_code(resp, 200)
         assert_valid_schema(resp, 'user.json')
+
+    def test_get_user_stats(self, user_admin, quotes):
+        """Tests admin user getting the stats of the user."""
+
+        resp = self.actions.get_user(user_admin.id)
+        assert_valid_status_code(resp, 200)
+
+        total_submitted = sum(q.status.name == 'published' for q in quotes)
+        assert resp.json['data']['stats'] == {
+            'total_likes': 0,
+            'total_submitted': total_submitted,
+        }
+
+    def test_user_stats_drift(self, user_admin):
+        """Tests the stored stats of the users matching the quotes."""
+
+        # pylint: disable=import-outside-toplevel
+        from devquotes.routes import stats
+
+        assert stats.get_user_stats_drift() == []
+
+        UserStats.get(model_id=user_admin.id).update(total_submitted=0)
+        assert len(stats.get_user_stats_drift()) == 1
+
+        stats.recompute_user_stats()
+        assert stats.get_user_stats_drift() == []
+
+    def test_user_stats_after_expired_update(self, quotes):
+        """Tests unpublishing an expired quote moving its contributor's
+        `total_submitted`."""
+
+        # pylint: disable=import-outside-toplevel
+        from devquotes.routes import db_client, stats
+
+        quote = next(q for q in quotes if q.status.name == 'published')
+        published_id = quote.status_id
+
+        for status_id in (db_client.get_quote_status_id('pending_review'), published_id):
+            db.session.expire(quote)
+            quote.status_id = status_id
+            db.session.commit()
+
+            assert stats.get_user_stats_drift() == []
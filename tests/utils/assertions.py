@@ -1,10 +1,14 @@
 """This module contains assertion's helper functions."""
 
 import re
+from contextlib import contextmanager
 from os.path import join, dirname
 
 import jsonref
 from jsonschema import validate
+from sqlalchemy import event
+
+from devquotes.models import db
 
 
 def assert_valid_schema(response, schema_file):
@@ -45,6 +49,81 @@ def assert_valid_search_results(response, query):
             pattern.search(quote['data']['author'])
 
 
+@contextmanager
+def assert_max_queries(max_queries):
+    """Asserts the block issues at most the given SQL statements.
+
+    The session is expired first, so the objects loaded by earlier tests
+    can't hide lazy loads behind the identity map.
+
+    Args:
+        max_queries (int): The maximum statements allowed.
+    """
+
+    statements = []
+
+    def before_cursor_execute(_, __, statement, *___):
+        statements.append(statement)
+
+    db.session.expire_all()
+
+    engine = db.get_engine()
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+    assert len(statements) <= max_queries, '\n\n'.join(statements)
+
+
+@contextmanager
+def assert_index_scans(*tables):
+    """Asserts the queries of the block read the given tables by index.
+
+    The queries are explained with sequential scans discouraged, a table
+    is still scanned sequentially if none of its indexes fits the query,
+    so the small test tables don't hide a missing index.
+
+    Args:
+        tables (list): The names of the tables that must not be
+            scanned sequentially.
+    """
+
+    queries = []
+
+    def before_cursor_execute(_, __, statement, parameters, *___):
+        if statement.lstrip().upper().startswith('SELECT'):
+            queries.append((statement, parameters))
+
+    engine = db.get_engine()
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield queries
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+    seq_scan_re = re.compile(rf'Seq Scan on "?({"|".join(tables)})"?(\s|$)')
+
+    for statement, parameters in queries:
+        plan = _explain(engine, statement, parameters)
+        assert not seq_scan_re.search(plan), f'{statement}\n\n{plan}'
+
+
+def _explain(engine, statement, parameters):
+    """A helper that returns the query plan of the given statement."""
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        cursor.execute(f'EXPLAIN {statement}', parameters)
+        return '\n'.join(row[0] for row in cursor.fetchall())
+    finally:
+        connection.rollback()
+        connection.close()
+
+
 def _load_json_schema(filename):
     """A helper function to load the schema file"""
 
@@ -0,0 +1,50 @@
+"""This module contains a stand-in for memcached used by the tests."""
+
+import socketserver
+import threading
+
+
+class MemcachedStub(socketserver.ThreadingUnixStreamServer):
+    """A Unix socket server that speaks the subset of the memcached text
+    protocol used by the response cache, the values never expire.
+
+    Args:
+        path (string): The path of the Unix socket to listen on.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path):
+        super().__init__(path, _MemcachedHandler)
+        self.values = {}
+
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_):
+        self.shutdown()
+        self.server_close()
+
+
+class _MemcachedHandler(socketserver.StreamRequestHandler):
+    """Handles the `get` and `set` commands."""
+
+    def handle(self):
+        values = self.server.values
+
+        for line in self.rfile:
+            command, *args = line.split()
+
+            if command == b'get':
+                value = values.get(args[0])
+                if value is not None:
+                    self.wfile.write(b'VALUE %s 0 %d\r\n%s\r\n' % (args[0], len(value), value))
+                self.wfile.write(b'END\r\n')
+            elif command == b'set':
+                values[args[0]] = self.rfile.read(int(args[3]) + 2)[:-2]
+                self.wfile.write(b'STORED\r\n')
+            else:
+                self.wfile.write(b'ERROR\r\n')